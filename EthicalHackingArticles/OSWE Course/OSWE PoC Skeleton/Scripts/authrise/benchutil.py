@@ -0,0 +1,78 @@
+import contextlib
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import httpx
+
+# Helpers shared by the benchmark harnesses (blind_sqli_bench.py and
+# poc-brute-force-secret.py --bench). Stdlib and httpx only, so neither
+# script drags in the other's client or fixture dependencies.
+
+STARTUP_TIMEOUT = 10.0
+
+
+# -----------------------
+# Local target
+# -----------------------
+
+
+def port_free(port: int) -> None:
+    """Raise if something already listens on `port`."""
+    with socket.socket() as sock:
+        # Connections of an earlier run in TIME_WAIT don't count
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind(("", port))
+        except OSError as e:
+            raise RuntimeError(f"port {port} is already in use: {e}") from None
+
+
+@contextlib.contextmanager
+def local_server(
+    server: Path, port: int, seed: Optional[int], extra: Sequence[str] = ()
+):
+    """
+    Spawn a local fixture and wait until it answers /stats. The port must
+    be free beforehand and the fixture still running once it answers, or
+    a leftover server on the port would be benchmarked instead.
+    """
+    port_free(port)
+    cmd = [sys.executable, str(server), "--port", str(port), *extra]
+    if seed is not None:
+        cmd += ["--seed", str(seed)]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while True:
+            try:
+                httpx.get(f"{base}/stats")
+                break
+            except httpx.TransportError:
+                if proc.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"{server.name} did not start on {port}")
+                time.sleep(0.1)
+        if proc.poll() is not None:
+            raise RuntimeError(f"{server.name} exited, is port {port} taken?")
+        yield base
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+# -----------------------
+# Statistics
+# -----------------------
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Linear-interpolated percentile, q in [0, 100]."""
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    lo = int(rank)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (rank - lo)
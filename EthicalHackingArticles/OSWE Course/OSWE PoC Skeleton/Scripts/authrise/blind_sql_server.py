@@ -1,75 +1,166 @@
+import argparse
 import random
 import string
 import time
 
 from flask import Flask, jsonify, request
 
+import netsim
+from metrics import Metrics, install
+
 app = Flask(__name__)
 
 TOKEN_LEN = 24
 SLEEP_TIME = 3
 CHARSET = string.ascii_letters + string.digits
+ROLES = ["admin", "user", "guest"]
 
 state = {
     "token": None,
-    "requests": 0,
+    "table": [],
+    "reset_at": 0,  # metrics.started() at the last /reset
     "completed_methods": 0,
 }
 
+metrics = Metrics()
+
 
 def new_token():
     return "".join(random.choice(CHARSET) for _ in range(TOKEN_LEN))
 
 
-@app.before_request
-def count_requests():
-    state["requests"] += 1
+def new_table():
+    """users(username, password, role) with a random number of rows."""
+    return [
+        {
+            "username": "".join(
+                random.choice(string.ascii_lowercase)
+                for _ in range(random.randint(4, 10))
+            ),
+            "password": "".join(
+                random.choice(CHARSET) for _ in range(random.randint(12, 24))
+            ),
+            "role": random.choice(ROLES),
+        }
+        for _ in range(random.randint(3, 8))
+    ]
+
+
+def target(data, db=None):
+    """
+    The token, or users[row - 1][column] when the probe names a cell.
+    None for a cell that does not exist. db holds the token and table,
+    the server's state unless given (blind_sqli_sim.py passes its own).
+    """
+    db = state if db is None else db
+    if "row" not in data:
+        return db["token"]
+    row = data["row"]
+    if row < 1 or row > len(db["table"]):
+        return None
+    return db["table"][row - 1].get(data["column"])
 
 
-@app.route("/vuln", methods=["POST"])
-def vuln():
+def probe_op(request):
+    """The op of a /vuln probe, for the per-op counters in /metrics."""
+    if request.path != "/vuln":
+        return None
+    return (request.get_json(silent=True) or {}).get("op")
+
+
+def vuln_delay(data, db=None):
     """
-    Expects JSON:
+    Seconds /vuln sleeps for a probe. Expects JSON:
       {
         "pos": 5,
         "op": ">",
-        "value": 77
+        "value": 77,
+        "sleep": 0.4,       (optional, defaults to SLEEP_TIME)
+        "row": 2,           (optional, with column: probe a users cell)
+        "column": "password"
       }
     Simulates:
-      IF(ASCII(SUBSTRING(token, pos, 1)) > value, SLEEP(3), 0)
+      IF(ASCII(SUBSTRING(token, pos, 1)) > value, SLEEP(sleep), 0)
+    op is one of >, <, = or & (bit test: ASCII(...) & value != 0).
+    op - encodes the character in the delay instead:
+      SLEEP((ASCII(SUBSTRING(token, pos, 1)) - value) * sleep)
     """
-    data = request.json
     pos = data["pos"]
     op = data["op"]
     value = data["value"]
+    sleep = data.get("sleep", SLEEP_TIME)
 
-    token = state["token"]
+    token = target(data, db)
 
-    if pos < 1 or pos > len(token):
-        return jsonify(ok=True)
+    if token is None or pos < 1 or pos > len(token):
+        return 0
 
     c = ord(token[pos - 1])
 
+    if op == "-":
+        return max(c - value, 0) * sleep
+
     condition = {
         ">": c > value,
         "<": c < value,
         "=": c == value,
+        "&": c & value != 0,
     }[op]
 
-    if condition:
-        time.sleep(SLEEP_TIME)
+    return sleep if condition else 0
+
+
+def length_delay(data, db=None):
+    """
+    IF(LENGTH(token) > value, SLEEP(sleep), 0)
+    row and column select a users cell as in /vuln.
+    """
+    token = target(data, db)
+    if token is not None and len(token) > data["value"]:
+        return data.get("sleep", SLEEP_TIME)
+    return 0
+
+
+def count_delay(data, db=None):
+    """
+    IF((SELECT COUNT(*) FROM users) > value, SLEEP(sleep), 0)
+    """
+    db = state if db is None else db
+    if len(db["table"]) > data["value"]:
+        return data.get("sleep", SLEEP_TIME)
+    return 0
+
+
+def reset_state():
+    state["token"] = new_token()
+    state["table"] = new_table()
+    state["reset_at"] = metrics.started()
+    state["completed_methods"] = 0
+
+
+def stats_body():
+    return {
+        "token": state["token"],
+        "table": state["table"],
+        "requests": metrics.started() - state["reset_at"],
+    }
+
 
+@app.route("/vuln", methods=["POST"])
+def vuln():
+    time.sleep(vuln_delay(request.json))
     return jsonify(ok=True)
 
 
 @app.route("/length", methods=["POST"])
 def length():
-    """
-    IF(LENGTH(token) > value, SLEEP(3), 0)
-    """
-    value = request.json["value"]
-    if len(state["token"]) > value:
-        time.sleep(SLEEP_TIME)
+    time.sleep(length_delay(request.json))
+    return jsonify(ok=True)
+
+
+@app.route("/count", methods=["POST"])
+def count():
+    time.sleep(count_delay(request.json))
     return jsonify(ok=True)
 
 
@@ -81,21 +172,32 @@ def done():
 
 @app.route("/reset", methods=["POST"])
 def reset():
-    state["token"] = new_token()
-    state["requests"] = 0
-    state["completed_methods"] = 0
+    reset_state()
     return jsonify(ok=True)
 
 
+@app.route("/metrics")
+def metrics_view():
+    return jsonify(metrics.snapshot())
+
+
 @app.route("/stats")
 def stats():
-    return jsonify(
-        token=state["token"],
-        requests=state["requests"],
-    )
+    return jsonify(**stats_body())
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument(
+        "--seed", type=int, default=None, help="Seed the token sequence"
+    )
+    netsim.add_arguments(parser)
+    args = parser.parse_args()
+
+    install(app, metrics, netsim.from_args(args), op=probe_op)
+    random.seed(args.seed)
     state["token"] = new_token()
+    state["table"] = new_table()
     print("[server] token:", state["token"])
-    app.run(host="0.0.0.0", port=9001)
+    app.run(host="0.0.0.0", port=args.port)
@@ -0,0 +1,169 @@
+import argparse
+import asyncio
+import json
+import random
+
+import blind_sql_server as fixture
+import netsim
+
+# Drop-in replacement for blind_sql_server.py on plain asyncio streams.
+# Same routes and semantics, but a sleeping probe is a suspended
+# coroutine instead of a blocked thread, so thousands can wait at once.
+
+BACKLOG = 4096
+MAX_BODY = 64 * 1024
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+}
+
+DELAYS = {
+    "/vuln": fixture.vuln_delay,
+    "/length": fixture.length_delay,
+    "/count": fixture.count_delay,
+}
+
+OK = {"ok": True}
+
+network = None  # netsim.Network, set from the --net-* flags
+metrics = fixture.metrics
+
+
+class BadRequest(Exception):
+    def __init__(self, status: int):
+        self.status = status
+
+
+async def read_request(reader: asyncio.StreamReader):
+    """(method, path, body, keep_alive), or None once the client has gone."""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise BadRequest(400)
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length", 0))
+    except ValueError:
+        raise BadRequest(400)
+    if length < 0:
+        raise BadRequest(400)
+    if length > MAX_BODY:
+        raise BadRequest(413)
+    body = await reader.readexactly(length) if length else b""
+
+    keep_alive = version == "HTTP/1.1"
+    if "close" in headers.get("connection", "").lower():
+        keep_alive = False
+    return method, target.split("?", 1)[0], body, keep_alive
+
+
+async def respond(method: str, path: str, body: bytes):
+    """(status, payload, op) for one request, sleeping as the probe demands."""
+    if method == "POST" and path in DELAYS:
+        try:
+            data = json.loads(body)
+            delay = DELAYS[path](data)
+        except (ValueError, KeyError, TypeError):
+            return 400, {"ok": False}, None
+        if delay:
+            await asyncio.sleep(delay)
+        return 200, OK, data.get("op")
+
+    if method == "POST" and path == "/done":
+        fixture.state["completed_methods"] += 1
+        return 200, OK, None
+    if method == "POST" and path == "/reset":
+        fixture.reset_state()
+        return 200, OK, None
+    if method == "GET" and path == "/stats":
+        return 200, fixture.stats_body(), None
+    if method == "GET" and path == "/metrics":
+        return 200, metrics.snapshot(), None
+    return 404, {"ok": False}, None
+
+
+def encode(status: int, payload: dict, keep_alive: bool) -> bytes:
+    content = json.dumps(payload).encode()
+    head = (
+        f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(content)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode() + content
+
+
+async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        while True:
+            try:
+                request = await read_request(reader)
+            except BadRequest as e:
+                writer.write(encode(e.status, {"ok": False}, False))
+                break
+            if request is None:
+                break
+
+            method, path, body, keep_alive = request
+            started = metrics.begin()
+            if network is not None and path not in netsim.CONTROL_PATHS:
+                if network.drop():
+                    metrics.end(path, started, 0)  # 0: dropped, no status sent
+                    writer.transport.abort()
+                    break
+                if not network.admit(writer.get_extra_info("peername")[0]):
+                    metrics.end(path, started, 429)
+                    payload = {"ok": False, "error": "rate limited"}
+                    writer.write(encode(429, payload, keep_alive))
+                    await writer.drain()
+                    continue
+                await asyncio.sleep(network.delay())
+
+            status, payload, op = await respond(method, path, body)
+            metrics.end(path, started, status, op if path == "/vuln" else None)
+            writer.write(encode(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host: str, port: int):
+    server = await asyncio.start_server(handle, host, port, backlog=BACKLOG)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=9001)
+    parser.add_argument(
+        "--seed", type=int, default=None, help="Seed the token sequence"
+    )
+    netsim.add_arguments(parser)
+    args = parser.parse_args()
+
+    network = netsim.from_args(args)
+    random.seed(args.seed)
+    fixture.reset_state()
+    print("[server] token:", fixture.state["token"])
+    asyncio.run(serve(args.host, args.port))
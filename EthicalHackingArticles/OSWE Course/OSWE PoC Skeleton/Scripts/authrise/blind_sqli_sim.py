@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import contextlib
+import csv
+import itertools
+import json
+import os
+import random
+import selectors
+import statistics
+from dataclasses import asdict, dataclass
+from typing import List, Optional
+
+import httpx
+
+import blind_sql_server as fixture
+import blind_sqli_client as client
+import netsim
+
+BASE = "http://sim.invalid"
+
+# -----------------------
+# Virtual clock
+# -----------------------
+
+
+class VirtualClock:
+    """Simulated seconds, advanced only by waits, never by real time."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class VirtualSelector(selectors.DefaultSelector):
+    """
+    Polls without blocking and jumps the clock to the next timer instead
+    of sleeping until it, so a loop that is only waiting costs nothing.
+    """
+
+    def __init__(self, clock: VirtualClock):
+        super().__init__()
+        self.clock = clock
+
+    def select(self, timeout: Optional[float] = None):
+        events = super().select(0)
+        if events:
+            return events
+        if timeout is None:
+            raise RuntimeError("simulation deadlocked: nothing scheduled")
+        self.clock.now += max(timeout, 0.0)
+        return events
+
+
+class VirtualLoop(asyncio.SelectorEventLoop):
+    def __init__(self, clock: VirtualClock):
+        super().__init__(VirtualSelector(clock))
+        self.clock = clock
+
+    def time(self) -> float:
+        return self.clock.now
+
+
+# -----------------------
+# Simulated target
+# -----------------------
+
+
+@dataclass(slots=True)
+class Network:
+    """Round-trip latency of the simulated link."""
+
+    latency: float = 0.05
+    jitter: float = 0.01
+    distribution: str = "normal"  # normal | lognormal | pareto
+    loss: float = 0.0  # chance a request waits out a retransmission
+    rto: float = 0.2
+
+
+DELAYS = {
+    "/vuln": fixture.vuln_delay,
+    "/length": fixture.length_delay,
+    "/count": fixture.count_delay,
+}
+
+
+class SimTarget:
+    """
+    In-process blind_sql_server: its delay functions, run against a
+    database of this target's own token and an empty users table.
+    """
+
+    def __init__(self, token: str, network: Network, seed: int):
+        self.db = {"token": token, "table": []}
+        self.network = network
+        self.rng = random.Random(seed)
+        self.requests = 0
+
+    def rtt(self) -> float:
+        net = self.network
+        rtt = netsim.draw_latency(self.rng, net.distribution, net.latency, net.jitter)
+        if self.rng.random() < net.loss:
+            rtt += net.rto
+        return rtt
+
+    def delay(self, request: httpx.Request) -> float:
+        self.requests += 1
+        sleep = DELAYS[request.url.path](json.loads(request.content), self.db)
+        return sleep + self.rtt()
+
+
+def read_timeout(request: httpx.Request) -> Optional[float]:
+    return request.extensions.get("timeout", {}).get("read")
+
+
+class SimTransport(httpx.BaseTransport):
+    def __init__(self, target: SimTarget, clock: VirtualClock):
+        self.target = target
+        self.clock = clock
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        delay = self.target.delay(request)
+        timeout = read_timeout(request)
+        if timeout is not None and delay > timeout:
+            self.clock.now += timeout
+            raise httpx.ReadTimeout("simulated read timeout", request=request)
+        self.clock.now += delay
+        return httpx.Response(200, json={"ok": True})
+
+
+class AsyncSimTransport(httpx.AsyncBaseTransport):
+    def __init__(self, target: SimTarget):
+        self.target = target
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        delay = self.target.delay(request)
+        timeout = read_timeout(request)
+        if timeout is not None and delay > timeout:
+            await asyncio.sleep(timeout)
+            raise httpx.ReadTimeout("simulated read timeout", request=request)
+        await asyncio.sleep(delay)
+        return httpx.Response(200, json={"ok": True})
+
+
+# -----------------------
+# Strategies
+# -----------------------
+
+
+@dataclass(slots=True)
+class Config:
+    strategy: str
+    concurrency: Optional[int]
+    fanout: Optional[int]
+    threshold: float
+    latency: float
+    jitter: float
+    loss: float
+    distribution: str
+
+
+@dataclass(slots=True)
+class Outcome:
+    seconds: float
+    requests: int
+    errors: int  # wrong characters, a wrong length counts every position
+
+
+@contextlib.contextmanager
+def patched_client(**values):
+    """Point blind_sqli_client's module globals at the sim, then restore them."""
+    saved = {name: getattr(client, name) for name in values}
+    for name, value in values.items():
+        setattr(client, name, value)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(client, name, value)
+
+
+def simulate(
+    cfg: Config,
+    token: str,
+    charset: str,
+    seed: int,
+    calibrate: bool,
+    length: Optional[int],
+    early_abort: bool = False,
+) -> Outcome:
+    clock = VirtualClock()
+    network = Network(cfg.latency, cfg.jitter, cfg.distribution, cfg.loss)
+    target = SimTarget(token, network, seed)
+
+    with patched_client(
+        clock=clock,
+        transport=SimTransport(target, clock),
+        async_transport=AsyncSimTransport(target),
+        THRESHOLD=cfg.threshold,
+    ), open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        opts = client.RunOptions(
+            concurrency=cfg.concurrency or 1,
+            model=client.calibrate(BASE) if calibrate else None,
+            early_abort=early_abort,
+            charset=charset,
+            length=length,
+            fanout=cfg.fanout or 2,
+        )
+        start = clock.now
+
+        loop = VirtualLoop(clock)
+        try:
+            run = client.STRATEGIES[cfg.strategy].run(BASE, opts)
+            result = loop.run_until_complete(run)
+        finally:
+            loop.close()
+
+    found = result["token"]
+    if len(found) != len(token):
+        errors = len(token)
+    else:
+        errors = sum(a != b for a, b in zip(found, token))
+    return Outcome(clock.now - start, result["requests"], errors)
+
+
+# -----------------------
+# Sweep
+# -----------------------
+
+
+def configs(args) -> List[Config]:
+    out = []
+    for strategy in args.strategy:
+        concurrent = client.STRATEGIES[strategy].concurrent
+        concurrency = args.concurrency if concurrent else [None]
+        fanout = args.fanout if strategy == "kary" else [None]
+        for c, k, t, j, loss in itertools.product(
+            concurrency, fanout, args.threshold, args.jitter, args.loss
+        ):
+            out.append(
+                Config(strategy, c, k, t, args.latency, j, loss, args.distribution)
+            )
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the blind SQLi strategies against a simulated target "
+        "on a virtual clock"
+    )
+    parser.add_argument(
+        "--strategy",
+        nargs="+",
+        choices=client.STRATEGIES.keys(),
+        default=list(client.STRATEGIES),
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[20])
+    parser.add_argument("--fanout", type=int, nargs="+", default=[4])
+    parser.add_argument(
+        "--threshold", type=float, nargs="+", default=[client.THRESHOLD]
+    )
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, nargs="+", default=[0.01])
+    parser.add_argument("--loss", type=float, nargs="+", default=[0.0])
+    parser.add_argument(
+        "--distribution", choices=["normal", "lognormal", "pareto"], default="normal"
+    )
+    parser.add_argument("--calibrate", action="store_true")
+    parser.add_argument(
+        "--early-abort",
+        action="store_true",
+        help="Abandon probes once they are past the threshold",
+    )
+    parser.add_argument("--charset", choices=client.CHARSETS.keys(), default="alnum")
+    parser.add_argument("--token-length", type=int, default=24)
+    parser.add_argument(
+        "--length",
+        type=int,
+        default=None,
+        help="Length given to the strategies, discovered when omitted",
+    )
+    parser.add_argument("--trials", type=int, default=3, help="Seeds per config")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--csv", default=None, help="Write one row per config here")
+    args = parser.parse_args()
+
+    charset = client.CHARSETS[args.charset]
+    rows = []
+    header = (
+        f"{'strategy':<13}{'conc':>5}{'k':>4}{'thresh':>8}{'jitter':>8}"
+        f"{'loss':>7}{'sim s':>10}{'requests':>10}{'err rate':>10}"
+    )
+    print(header)
+
+    for cfg in configs(args):
+        outcomes = []
+        for trial in range(args.trials):
+            seed = args.seed + trial
+            rng = random.Random(seed)
+            token = "".join(rng.choice(charset) for _ in range(args.token_length))
+            outcomes.append(
+                simulate(
+                    cfg,
+                    token,
+                    charset,
+                    seed,
+                    args.calibrate,
+                    args.length,
+                    args.early_abort,
+                )
+            )
+
+        row = asdict(cfg) | {
+            "seconds": statistics.fmean(o.seconds for o in outcomes),
+            "requests": statistics.fmean(o.requests for o in outcomes),
+            "error_rate": sum(o.errors for o in outcomes)
+            / (args.token_length * len(outcomes)),
+        }
+        rows.append(row)
+        print(
+            f"{cfg.strategy:<13}{cfg.concurrency or '-':>5}{cfg.fanout or '-':>4}"
+            f"{cfg.threshold:>8.2f}{cfg.jitter:>8.3f}{cfg.loss:>7.3f}"
+            f"{row['seconds']:>10.1f}{row['requests']:>10.0f}"
+            f"{row['error_rate']:>10.3f}"
+        )
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()
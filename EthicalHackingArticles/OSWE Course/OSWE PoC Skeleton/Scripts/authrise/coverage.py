@@ -0,0 +1,139 @@
+import mmap
+import os
+import re
+import struct
+import zlib
+from typing import Iterator, Tuple
+
+import keyspace as ks
+
+# Persistent record of which keyspace candidates were already tried, one
+# bit per candidate in a memory-mapped file (~12 MB for 10^8 candidates),
+# so an interrupted spray resumes where it stopped.
+#
+# File layout: a HEADER_SIZE-byte header (magic, version, keyspace size and
+# fingerprint, epoch, found index) followed by the bits, candidate i at
+# bit i % 8 of byte i // 8.
+
+MAGIC = b"COVR"
+VERSION = 1
+HEADER = struct.Struct("<4sIQIqq")  # magic, version, size, fingerprint, epoch, found
+HEADER_SIZE = 64
+CHUNK = 1 << 16  # bytes scanned per step when looking for untried candidates
+NOT_FULL = re.compile(rb"[^\xff]")
+
+
+def fingerprint(keyspace: ks.Keyspace) -> int:
+    """Identifies the keyspace a coverage file was written for."""
+    params = sorted(vars(keyspace).items())
+    return zlib.crc32(f"{type(keyspace).__name__}{params}".encode())
+
+
+class Coverage:
+    """
+    Tried-candidate bitmap of one keyspace for the current secret epoch.
+
+    A new epoch starts, and the bits are cleared, once the secret is known
+    to have changed: when the last hit no longer works, or after the whole
+    keyspace was swept without one. Sprays in several processes
+    can share the file as long as each one only marks the bytes
+    pending() hands it.
+    """
+
+    def __init__(self, path: str, keyspace: ks.Keyspace):
+        self.path = path
+        self.size = len(keyspace)
+        self.nbytes = (self.size + 7) // 8
+        key = fingerprint(keyspace)
+
+        fresh = not os.path.exists(path)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fresh:
+                os.ftruncate(fd, HEADER_SIZE + self.nbytes)
+            self.mm = mmap.mmap(fd, HEADER_SIZE + self.nbytes)
+        finally:
+            os.close(fd)
+
+        if fresh:
+            self.write_header(key, 0, -1)
+        magic, version, size, stored, _, _ = HEADER.unpack_from(self.mm)
+        if (magic, version, size, stored) != (MAGIC, VERSION, self.size, key):
+            self.mm.close()
+            raise ValueError(f"{path} is not a coverage file of this keyspace")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if not self.mm.closed:
+            self.mm.flush()
+            self.mm.close()
+
+    def write_header(self, key: int, epoch: int, found: int):
+        HEADER.pack_into(self.mm, 0, MAGIC, VERSION, self.size, key, epoch, found)
+
+    @property
+    def epoch(self) -> int:
+        return HEADER.unpack_from(self.mm)[4]
+
+    @property
+    def found(self) -> int:
+        """Index of the last hit in this epoch, -1 if none."""
+        return HEADER.unpack_from(self.mm)[5]
+
+    @found.setter
+    def found(self, index: int):
+        _, _, _, key, epoch, _ = HEADER.unpack_from(self.mm)
+        self.write_header(key, epoch, index)
+
+    def tried(self, index: int) -> bool:
+        return bool(self.mm[HEADER_SIZE + (index >> 3)] >> (index & 7) & 1)
+
+    def mark(self, index: int):
+        self.mm[HEADER_SIZE + (index >> 3)] |= 1 << (index & 7)
+
+    def count(self) -> int:
+        """Candidates tried so far in this epoch."""
+        return int.from_bytes(self.mm[HEADER_SIZE:], "little").bit_count()
+
+    @property
+    def exhausted(self) -> bool:
+        return self.count() == self.size
+
+    def rotate(self):
+        """Start a new epoch: clear every bit and forget the last hit."""
+        _, _, _, key, epoch, _ = HEADER.unpack_from(self.mm)
+        for start in range(HEADER_SIZE, HEADER_SIZE + self.nbytes, CHUNK):
+            stop = min(start + CHUNK, HEADER_SIZE + self.nbytes)
+            self.mm[start:stop] = bytes(stop - start)
+        self.write_header(key, epoch + 1, -1)
+
+    def pending(
+        self, keyspace: ks.Keyspace, k: int = 0, n: int = 1
+    ) -> Iterator[Tuple[int, str]]:
+        """
+        Untried (index, candidate) of share k of n. Shares are whole bytes
+        of the bitmap, so no two sharers ever write the same byte; fully
+        tried bytes are skipped without looking at their candidates.
+        """
+        if keyspace.streaming:
+            for index, candidate in keyspace.slice():
+                if (index >> 3) % n == k and not self.tried(index):
+                    yield index, candidate
+            return
+
+        step = CHUNK * n
+        for base in range(k, self.nbytes, step):
+            start = HEADER_SIZE + base
+            view = self.mm[start : min(start + step, HEADER_SIZE + self.nbytes) : n]
+            for match in NOT_FULL.finditer(view):
+                byte = base + match.start() * n
+                bits = view[match.start()]
+                for bit in range(8):
+                    index = byte * 8 + bit
+                    if index < self.size and not bits >> bit & 1:
+                        yield index, keyspace.candidate(index)
@@ -0,0 +1,163 @@
+import argparse
+import itertools
+import string
+from abc import ABC, abstractmethod
+from typing import Iterator, List, Optional, Tuple
+
+# Lazy candidate keyspaces for spray_token. Nothing is materialised: a
+# candidate is computed from its index (or read from the wordlist) when a
+# worker asks for it, so memory stays constant whatever the size.
+
+MASK_CHARSETS = {
+    "d": string.digits,
+    "l": string.ascii_lowercase,
+    "u": string.ascii_uppercase,
+    "h": "0123456789abcdef",
+    "H": "0123456789ABCDEF",
+    "s": string.punctuation + " ",
+    "a": string.ascii_letters + string.digits + string.punctuation + " ",
+}
+
+
+class Keyspace(ABC):
+    """
+    Indexed candidates. Subclasses give len() and candidate(index), and
+    also override slice() and set `streaming` when they can only stream.
+    """
+
+    streaming = False
+
+    @abstractmethod
+    def __len__(self) -> int: ...
+
+    @abstractmethod
+    def candidate(self, index: int) -> str: ...
+
+    def slice(
+        self, start: int = 0, stop: Optional[int] = None, step: int = 1
+    ) -> Iterator[Tuple[int, str]]:
+        """(index, candidate) for range(start, stop, step)."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        for index in range(start, stop, step):
+            yield index, self.candidate(index)
+
+    def shard(self, k: int, n: int) -> Iterator[Tuple[int, str]]:
+        """Every n-th candidate from k, the share of worker k of n."""
+        return self.slice(k, None, n)
+
+
+class RangeKeyspace(Keyspace):
+    """Integers lo..hi inclusive, zero-padded to `width`."""
+
+    def __init__(self, lo: int, hi: int, width: int = 0):
+        self.lo, self.hi, self.width = lo, hi, width
+
+    def __len__(self) -> int:
+        return max(self.hi - self.lo + 1, 0)
+
+    def candidate(self, index: int) -> str:
+        return str(self.lo + index).zfill(self.width)
+
+
+class MaskKeyspace(Keyspace):
+    """
+    One charset per position, e.g. parse_mask("PIN-?d?d?d?d"). The index
+    is read as a mixed-radix number, last position fastest.
+    """
+
+    def __init__(self, positions: List[str]):
+        self.positions = positions
+        self.size = 1
+        for charset in positions:
+            self.size *= len(charset)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def candidate(self, index: int) -> str:
+        out = []
+        for charset in reversed(self.positions):
+            index, digit = divmod(index, len(charset))
+            out.append(charset[digit])
+        return "".join(reversed(out))
+
+
+def parse_mask(mask: str) -> MaskKeyspace:
+    """hashcat-style mask: ?d ?l ?u ?h ?H ?s ?a, ?? for '?', anything else literal."""
+    positions = []
+    chars = iter(mask)
+    for c in chars:
+        if c != "?":
+            positions.append(c)
+            continue
+        kind = next(chars, "")
+        if kind == "?":
+            positions.append("?")
+        elif kind in MASK_CHARSETS:
+            positions.append(MASK_CHARSETS[kind])
+        else:
+            raise ValueError(f"unknown mask placeholder ?{kind}")
+    return MaskKeyspace(positions)
+
+
+def charset_keyspace(charset: str, length: int) -> MaskKeyspace:
+    """Every string of `length` characters drawn from `charset`."""
+    return MaskKeyspace([charset] * length)
+
+
+class WordlistKeyspace(Keyspace):
+    """
+    Lines of a wordlist, streamed from disk on every pass. The index is
+    the line number (blank lines skipped), counted once up front.
+    """
+
+    streaming = True
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self.size = sum(1 for line in f if line.strip())
+
+    def __len__(self) -> int:
+        return self.size
+
+    def candidate(self, index: int) -> str:
+        return next(self.slice(index, index + 1))[1]
+
+    def slice(
+        self, start: int = 0, stop: Optional[int] = None, step: int = 1
+    ) -> Iterator[Tuple[int, str]]:
+        with open(self.path, encoding="utf-8", errors="replace") as f:
+            words = (line.strip() for line in f)
+            numbered = enumerate(word for word in words if word)
+            yield from itertools.islice(numbered, start, stop, step)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("Keyspace options")
+    source = group.add_mutually_exclusive_group()
+    source.add_argument(
+        "--range",
+        type=int,
+        nargs=2,
+        metavar=("MIN", "MAX"),
+        default=[0, 5000],
+        help="Integer candidates, zero-padded to --width (default: 0 5000)",
+    )
+    source.add_argument("--mask", help="hashcat-style mask, e.g. ?d?d?d?d?d?d")
+    source.add_argument("--wordlist", help="One candidate per line")
+    source.add_argument(
+        "--charset", help="Every --length string over these characters"
+    )
+    group.add_argument("--width", type=int, default=4)
+    group.add_argument("--length", type=int, default=4)
+
+
+def from_args(args: argparse.Namespace) -> Keyspace:
+    if args.mask:
+        return parse_mask(args.mask)
+    if args.wordlist:
+        return WordlistKeyspace(args.wordlist)
+    if args.charset:
+        return charset_keyspace(args.charset, args.length)
+    return RangeKeyspace(args.range[0], args.range[1], args.width)
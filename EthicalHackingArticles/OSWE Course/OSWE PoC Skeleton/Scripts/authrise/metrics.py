@@ -0,0 +1,170 @@
+import bisect
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import netsim
+
+# Request metrics for the local fixtures (blind_sql_server.py,
+# blind_sql_server_async.py, web-server-probe.py), served at /metrics.
+
+# Upper bounds of the latency buckets: 1ms doubling up to ~65s, plus +inf
+BUCKETS = [0.001 * 2**i for i in range(17)]
+MAX_SHARDS = 64  # dead-thread shards are folded in past this many
+
+
+class Shard:
+    """Counters owned by one thread, only that thread ever writes them."""
+
+    __slots__ = ("started", "in_flight", "requests", "ops", "statuses", "hist", "sums")
+
+    def __init__(self):
+        self.started = 0
+        self.in_flight = 0
+        self.requests: Dict[str, int] = defaultdict(int)
+        self.ops: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[int, int] = defaultdict(int)
+        self.hist: Dict[str, List[int]] = {}
+        self.sums: Dict[str, float] = defaultdict(float)
+
+    def merge(self, other: "Shard") -> None:
+        self.started += other.started
+        self.in_flight += other.in_flight
+        for mine, theirs in (
+            (self.requests, other.requests),
+            (self.ops, other.ops),
+            (self.statuses, other.statuses),
+            (self.sums, other.sums),
+        ):
+            for key, value in dict(theirs).items():
+                mine[key] += value
+        for endpoint, counts in dict(other.hist).items():
+            hist = self.hist.setdefault(endpoint, [0] * (len(BUCKETS) + 1))
+            for i, n in enumerate(list(counts)):
+                hist[i] += n
+
+
+class Metrics:
+    """
+    Per-endpoint and per-op counters, an in-flight gauge and latency
+    histograms, sharded per thread.
+
+    begin() and end() only touch the calling thread's shard, so the
+    request path takes no lock. The lock is taken once per thread to
+    register its shard, and by readers, which sum all shards. Shards of
+    finished threads (Flask's dev server starts one per request) are
+    folded into a retired total so the shard list stays short.
+    """
+
+    def __init__(self):
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.shards: List[Tuple[threading.Thread, Shard]] = []
+        self.retired = Shard()
+
+    def shard(self) -> Shard:
+        shard = getattr(self.local, "shard", None)
+        if shard is None:
+            shard = self.local.shard = Shard()
+            with self.lock:
+                if len(self.shards) >= MAX_SHARDS:
+                    self.compact()
+                self.shards.append((threading.current_thread(), shard))
+        return shard
+
+    def compact(self) -> None:
+        """Fold shards of dead threads into `retired`. Caller holds the lock."""
+        alive = []
+        for thread, shard in self.shards:
+            if thread.is_alive():
+                alive.append((thread, shard))
+            else:
+                self.retired.merge(shard)
+        self.shards = alive
+
+    def begin(self) -> float:
+        shard = self.shard()
+        shard.started += 1
+        shard.in_flight += 1
+        return time.perf_counter()
+
+    def end(
+        self, endpoint: str, start: float, status: int, op: Optional[str] = None
+    ) -> None:
+        elapsed = time.perf_counter() - start
+        shard = self.shard()
+        shard.in_flight -= 1
+        shard.requests[endpoint] += 1
+        shard.statuses[status] += 1
+        if op is not None:
+            shard.ops[f"{endpoint}:{op}"] += 1
+        hist = shard.hist.get(endpoint)
+        if hist is None:
+            hist = shard.hist[endpoint] = [0] * (len(BUCKETS) + 1)
+        hist[bisect.bisect_left(BUCKETS, elapsed)] += 1
+        shard.sums[endpoint] += elapsed
+
+    def total(self) -> Shard:
+        with self.lock:
+            self.compact()
+            total = Shard()
+            total.merge(self.retired)
+            for _, shard in self.shards:
+                total.merge(shard)
+        return total
+
+    def started(self) -> int:
+        """Requests seen so far, including the ones still in flight."""
+        return self.total().started
+
+    def snapshot(self) -> Dict:
+        total = self.total()
+        return {
+            "requests": total.started,
+            "in_flight": total.in_flight,
+            "endpoints": dict(total.requests),
+            "ops": dict(total.ops),
+            "statuses": {str(k): v for k, v in total.statuses.items()},
+            "latency": {
+                endpoint: {
+                    "buckets": [*BUCKETS, "+Inf"],
+                    "counts": counts,
+                    "count": sum(counts),
+                    "sum": total.sums[endpoint],
+                }
+                for endpoint, counts in total.hist.items()
+            },
+        }
+
+
+def install(
+    app,
+    metrics: Metrics,
+    network: Optional[netsim.Network],
+    op: Optional[Callable[..., Optional[str]]] = None,
+) -> None:
+    """
+    Register the Flask request hooks of a fixture: time every request
+    into `metrics`, passing it through netsim.flask_gate() first. `op`
+    names the op of a request for the per-op counters; it is called
+    before the gate, which may hang up on the client.
+    """
+    from flask import g, request  # only the Flask fixtures get here
+
+    @app.before_request
+    def gate():
+        g.started = metrics.begin()
+        if op is not None:
+            g.op = op(request)
+        return netsim.flask_gate(network)
+
+    @app.after_request
+    def note_status(response):
+        g.setdefault("status", response.status_code)  # a netsim drop set 0
+        return response
+
+    @app.teardown_request
+    def record_request(exc):
+        # Runs even when a view raised and after_request never did
+        metrics.end(request.path, g.started, g.get("status", 500), g.get("op"))
@@ -0,0 +1,185 @@
+import argparse
+import random
+import socket
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+# Network-condition injection shared by the local fixtures
+# (blind_sql_server.py, blind_sql_server_async.py, web-server-probe.py,
+# web-server-probe-async.py). Every fault is drawn from one seeded RNG so
+# a run can be replayed. Control routes are never faulted: a benchmark
+# resetting the target or reading its answer must not be the thing that
+# fails.
+
+CONTROL_PATHS = frozenset({"/reset", "/stats", "/metrics", "/done"})
+
+
+@dataclass(slots=True)
+class Conditions:
+    latency: float = 0.0  # seconds added to every response
+    jitter: float = 0.0  # spread of the added latency
+    distribution: str = "normal"  # normal | lognormal | pareto
+    rate: float = 0.0  # per-client requests per second, 0 disables the limit
+    burst: int = 10  # requests a client may send back to back
+    slow_start: float = 0.0  # seconds for a new client's rate to ramp up
+    reset: float = 0.0  # chance a request's connection is dropped
+    seed: Optional[int] = None
+
+    @property
+    def active(self) -> bool:
+        return bool(self.latency or self.jitter or self.rate or self.reset)
+
+
+@dataclass(slots=True)
+class Bucket:
+    """Token bucket of one client, refilled at the (ramping) rate."""
+
+    first: float
+    last: float
+    tokens: float = 0.0
+
+
+class Network:
+    """
+    Decides, per request, whether a client is rate limited, whether its
+    connection is dropped and how long the response is held back.
+
+    Slow start models WAF/CDN throttling of new clients: a client's rate
+    climbs linearly from 10% to the full rate over `slow_start` seconds
+    after its first request.
+    """
+
+    def __init__(self, conditions: Conditions):
+        self.conditions = conditions
+        self.rng = random.Random(conditions.seed)
+        self.buckets: Dict[str, Bucket] = {}
+        self.lock = threading.Lock()
+
+    def delay(self) -> float:
+        c = self.conditions
+        if not c.latency and not c.jitter:
+            return 0.0
+        with self.lock:
+            return draw_latency(self.rng, c.distribution, c.latency, c.jitter)
+
+    def admit(self, client: str) -> bool:
+        """False when the client is over its rate and should get a 429."""
+        c = self.conditions
+        if not c.rate:
+            return True
+        now = time.monotonic()
+        with self.lock:
+            bucket = self.buckets.get(client)
+            if bucket is None:
+                bucket = self.buckets[client] = Bucket(now, now, float(c.burst))
+
+            rate = c.rate
+            if c.slow_start:
+                rate *= min(1.0, max(0.1, (now - bucket.first) / c.slow_start))
+            bucket.tokens = min(c.burst, bucket.tokens + (now - bucket.last) * rate)
+            bucket.last = now
+
+            if bucket.tokens < 1.0:
+                return False
+            bucket.tokens -= 1.0
+            return True
+
+    def drop(self) -> bool:
+        if not self.conditions.reset:
+            return False
+        with self.lock:
+            return self.rng.random() < self.conditions.reset
+
+
+def draw_latency(
+    rng: random.Random, distribution: str, latency: float, jitter: float
+) -> float:
+    """One latency draw around `latency`, never negative. Also used by the sim."""
+    if distribution == "lognormal":
+        sigma = jitter / latency if latency else 0.0
+        d = latency * rng.lognormvariate(0.0, sigma)
+    elif distribution == "pareto":
+        d = latency + jitter * (rng.paretovariate(3.0) - 1.0)
+    else:
+        d = rng.gauss(latency, jitter)
+    return max(d, 0.0)
+
+
+def drop_connection(sock: socket.socket) -> None:
+    """Hang up on a client mid-request, as a flaky middlebox would."""
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+
+def flask_gate(network: Optional[Network]):
+    """
+    before_request body for the Flask fixtures: drops, rate limits or
+    delays the current request. None lets it through to the view.
+    """
+    from flask import g, jsonify, request  # only the Flask fixtures get here
+
+    if network is None or request.path in CONTROL_PATHS:
+        return None
+    if network.drop():
+        drop_connection(request.environ["werkzeug.socket"])
+        g.status = 0  # recorded as dropped, as the asyncio fixtures do
+        return "", 200
+    if not network.admit(request.remote_addr):
+        return jsonify(ok=False, error="rate limited"), 429
+    time.sleep(network.delay())
+    return None
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("Network conditions")
+    group.add_argument("--net-latency", type=float, default=0.0)
+    group.add_argument("--net-jitter", type=float, default=0.0)
+    group.add_argument(
+        "--net-distribution",
+        choices=["normal", "lognormal", "pareto"],
+        default="normal",
+    )
+    group.add_argument(
+        "--net-rate",
+        type=float,
+        default=0.0,
+        help="Per-client requests/s before 429s (default: unlimited)",
+    )
+    group.add_argument("--net-burst", type=int, default=10)
+    group.add_argument(
+        "--net-slow-start",
+        type=float,
+        default=0.0,
+        help="Seconds for a new client's rate to ramp from 10%% to full",
+    )
+    group.add_argument(
+        "--net-reset", type=float, default=0.0, help="Chance to drop a connection"
+    )
+    group.add_argument("--net-seed", type=int, default=None)
+
+
+def to_argv(args: argparse.Namespace) -> List[str]:
+    """The --net-* flags of `args`, to pass on to a spawned fixture."""
+    argv = []
+    for name, value in vars(args).items():
+        if name.startswith("net_") and value is not None:
+            argv += [f"--{name.replace('_', '-')}", str(value)]
+    return argv
+
+
+def from_args(args: argparse.Namespace) -> Optional[Network]:
+    conditions = Conditions(
+        latency=args.net_latency,
+        jitter=args.net_jitter,
+        distribution=args.net_distribution,
+        rate=args.net_rate,
+        burst=args.net_burst,
+        slow_start=args.net_slow_start,
+        reset=args.net_reset,
+        seed=args.net_seed,
+    )
+    return Network(conditions) if conditions.active else None
@@ -1,82 +1,619 @@
 import argparse
 import asyncio
+import csv
+import functools
+import json
+import math
+import multiprocessing
+import queue
+import statistics
+import subprocess
 import sys
 import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
 
 import httpx
 
+import keyspace as ks
+from benchutil import local_server, percentile
+from coverage import Coverage
+from spray_transport import TRANSPORTS, HttpxTransport
 
-def create_list(min: int, max: int) -> list[str]:
-    numbers = list(range(min, max + 1))
-    return [str(number).zfill(4) for number in numbers]
 
+STOP_POLL = 0.005  # seconds between checks of the cross-process stop flag
+RESULT_POLL = 0.5  # seconds between liveness checks of sprayer processes
+MAX_ATTEMPTS = 3  # tries per candidate when requests time out, fail or get a 429
 
-def generate_urls(target: str, port: int, tokens: list) -> list[str]:
-    url_partial = f"http://{target}:{port}/probe?candidate="
-    return [f"{url_partial}{token}" for token in tokens]
 
+@dataclass
+class AIMD:
+    """
+    Additive-increase / multiplicative-decrease of the worker count. Every
+    `window` seconds the level grows by `increase` if no request failed and
+    mean latency is within `tolerance` of the best window so far, and is
+    multiplied by `decrease` after any timeout, transport error or 429.
+    """
 
-def sync_validate_token(urls: list[str]) -> str | None:
+    minimum: int = 1
+    maximum: int = 1000
+    increase: int = 5
+    decrease: float = 0.5
+    window: float = 0.5
+    tolerance: float = 0.5
+
+
+@dataclass
+class SprayStats:
+    requests: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+    # (elapsed seconds, worker level, responses/s) per AIMD window
+    timeline: list[tuple[float, int, float]] = field(default_factory=list)
+
+    @property
+    def rate(self) -> float:
+        return self.requests / self.seconds if self.seconds else 0.0
+
+
+def probe_prefix(target: str, port: int) -> str:
+    return f"http://{target}:{port}/probe?candidate="
+
+
+def sync_validate_token(
+    prefix: str, keyspace: ks.Keyspace, stats: SprayStats | None = None
+) -> str | None:
+    stats = stats if stats is not None else SprayStats()
+    start = time.perf_counter()
     client = httpx.Client(timeout=2.0)
-    for url in urls:
-        response = client.get(url)
-        if response.status_code == 200:
-            return url
+    try:
+        for _, candidate in keyspace.slice():
+            url = prefix + candidate
+            stats.requests += 1
+            response = client.get(url)
+            if response.status_code == 200:
+                return url
+    finally:
+        stats.seconds = time.perf_counter() - start
 
     return None
 
 
 async def spray_token(
-    urls: list[str],
+    prefix: str,
+    keyspace: ks.Keyspace,
     concurrency: int = 10,
+    shard: tuple[int, int] = (0, 1),
+    stop=None,
+    stats: SprayStats | None = None,
+    aimd: AIMD | None = None,
+    transport=HttpxTransport,
+    coverage: Coverage | None = None,
 ) -> str | None:
-    queue: asyncio.Queue[str] = asyncio.Queue()
-    for url in urls:
-        queue.put_nowait(url)
+    # Workers share one lazy iterator over this shard of the keyspace, so
+    # nothing is queued up front and the first request leaves immediately.
+    # `stop` is an optional multiprocessing.Event shared with other sprayers:
+    # it is set on a hit here and ends this spray when set elsewhere.
+    # With `aimd`, `concurrency` is only the starting worker count.
+    # `transport` is called with the prefix to build the HTTP client, see
+    # spray_transport.py. With `coverage`, candidates it has already seen
+    # answered are skipped and newly answered ones are marked.
+    if coverage is not None:
+        candidates = coverage.pending(keyspace, *shard)
+    else:
+        candidates = keyspace.shard(*shard)
+    retries: deque[tuple[int, str, int]] = deque()
+    stats = stats if stats is not None else SprayStats()
+    level = concurrency
+    live: set[int] = set()
+    tasks: list[asyncio.Task] = []
+    window = {"responses": 0, "errors": 0, "latency": 0.0}
 
     found_event = asyncio.Event()
+    drained_event = asyncio.Event()
     result: dict[str, str | None] = {"url": None}
+    start = time.perf_counter()
+
+    def take() -> tuple[int, str, int] | None:
+        if retries:
+            return retries.popleft()
+        item = next(candidates, None)
+        return None if item is None else (*item, 1)
 
-    async with httpx.AsyncClient(timeout=2.0) as client:
+    async with transport(prefix) as client:
 
         async def worker(worker_id: int):
-            while not found_event.is_set():
-                try:
-                    url = queue.get_nowait()
-                except asyncio.QueueEmpty:
-                    return
-
-                try:
-                    response = await client.get(url)
-                    if response.status_code == 200:
+            try:
+                while not found_event.is_set():
+                    # Workers above the level retire, but the last one stays
+                    # to finish any candidates queued for retry.
+                    if worker_id >= level and len(live) > 1:
+                        return
+                    item = take()
+                    if item is None:
+                        return
+
+                    index, candidate, attempt = item
+                    url = prefix + candidate
+                    stats.requests += 1
+                    sent = time.perf_counter()
+                    status = await client.status(candidate)
+                    window["responses"] += 1
+                    window["latency"] += time.perf_counter() - sent
+
+                    if coverage is not None and status not in (None, 429):
+                        coverage.mark(index)
+                    if status == 200:
                         result["url"] = url
+                        if coverage is not None:
+                            coverage.found = index
                         found_event.set()
+                        if stop is not None:
+                            stop.set()
                         return
-                except httpx.RequestError:
-                    pass
-                finally:
-                    queue.task_done()
-
-        tasks = [asyncio.create_task(worker(i)) for i in range(concurrency)]
-
+                    if status is None or status == 429:
+                        stats.errors += 1
+                        window["errors"] += 1
+                        if attempt < MAX_ATTEMPTS:
+                            retries.append((index, candidate, attempt + 1))
+            finally:
+                live.discard(worker_id)
+                if not live:
+                    drained_event.set()
+
+        def fill():
+            for worker_id in range(level):
+                if worker_id not in live:
+                    live.add(worker_id)
+                    tasks.append(asyncio.create_task(worker(worker_id)))
+
+        async def watch_stop():
+            while not stop.is_set():
+                await asyncio.sleep(STOP_POLL)
+            found_event.set()
+
+        async def tune():
+            nonlocal level
+            best = None
+            while True:
+                await asyncio.sleep(aimd.window)
+                n, errors = window["responses"], window["errors"]
+                mean = window["latency"] / n if n else None
+                window.update(responses=0, errors=0, latency=0.0)
+                elapsed = time.perf_counter() - start
+                stats.timeline.append((elapsed, level, n / aimd.window))
+
+                if errors:
+                    level = max(aimd.minimum, int(level * aimd.decrease))
+                elif mean is not None:
+                    best = mean if best is None else min(best, mean)
+                    if mean <= best * (1 + aimd.tolerance):
+                        level = min(aimd.maximum, level + aimd.increase)
+                fill()
+
+        fill()
+        if stop is not None:
+            tasks.append(asyncio.create_task(watch_stop()))
+        if aimd is not None:
+            tasks.append(asyncio.create_task(tune()))
+
+        # Done on a hit, here or in another process, or once every worker has
+        # run out of candidates.
+        found = asyncio.create_task(found_event.wait())
+        drained = asyncio.create_task(drained_event.wait())
         await asyncio.wait(
-            tasks,
+            [found, drained],
             return_when=asyncio.FIRST_COMPLETED,
         )
 
         # Cancel remaining workers
-        for task in tasks:
+        for task in [*tasks, found, drained]:
             task.cancel()
 
+        # A worker that raised would otherwise pass for a drained keyspace
+        for task in tasks:
+            if task.done() and not task.cancelled() and task.exception():
+                raise task.exception()
+
+    stats.seconds = time.perf_counter() - start
     return result["url"]
 
 
-def summarize(name: str, timings: list[float]):
-    avg = sum(timings) / len(timings)
-    print(f"\n{name} results over {len(timings)} runs:")
-    print(f"  min: {min(timings):.4f}s")
-    print(f"  max: {max(timings):.4f}s")
-    print(f"  avg: {avg:.4f}s")
+# -----------------------
+# Multi-process spraying
+# -----------------------
+
+
+def spray_process(
+    prefix: str,
+    keyspace: ks.Keyspace,
+    concurrency: int,
+    shard: tuple[int, int],
+    stop,
+    results,
+    aimd: AIMD | None = None,
+    transport=HttpxTransport,
+    coverage_path: str | None = None,
+):
+    """
+    Entry point of one sprayer process: its own loop and HTTP client.
+    Always reports (index, hit, stats, error), so the parent never waits
+    on a process that failed.
+    """
+    stats = SprayStats()
+    url, error, coverage = None, None, None
+    try:
+        coverage = Coverage(coverage_path, keyspace) if coverage_path else None
+        url = asyncio.run(
+            spray_token(
+                prefix,
+                keyspace,
+                concurrency,
+                shard,
+                stop,
+                stats,
+                aimd,
+                transport,
+                coverage,
+            )
+        )
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        if coverage is not None:
+            coverage.close()
+        results.put((shard[0], url, stats, error))
+
+
+def spray_multiprocess(
+    prefix: str,
+    keyspace: ks.Keyspace,
+    concurrency: int,
+    processes: int,
+    aimd: AIMD | None = None,
+    transport=HttpxTransport,
+    coverage_path: str | None = None,
+) -> tuple[str | None, list[SprayStats]]:
+    """
+    Split the keyspace across `processes` sprayers by index, each running
+    `concurrency` workers. Returns the hit and per-process stats. Blocks,
+    so call it from a thread when a loop is running. A sprayer that dies
+    without reporting (killed, say) is noticed by its exit code, and its
+    share of the keyspace is left untried.
+    """
+    stop = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    procs = [
+        multiprocessing.Process(
+            target=spray_process,
+            args=(
+                prefix,
+                keyspace,
+                concurrency,
+                (k, processes),
+                stop,
+                results,
+                aimd,
+                transport,
+                coverage_path,
+            ),
+        )
+        for k in range(processes)
+    ]
+    for proc in procs:
+        proc.start()
+
+    url = None
+    per_process: list[SprayStats] = [SprayStats() for _ in procs]
+    pending = set(range(processes))
+    while pending:
+        try:
+            k, hit, stats, error = results.get(timeout=RESULT_POLL)
+        except queue.Empty:
+            # A result is flushed before its process exits, so a process
+            # already gone with nothing left in the queue never reported
+            dead = [k for k in pending if procs[k].exitcode is not None]
+            if dead and results.empty():
+                for k in dead:
+                    print(f"[!] process {k} exited with {procs[k].exitcode}")
+                    pending.discard(k)
+            continue
+        if error is not None:
+            print(f"[!] process {k} failed: {error}")
+        pending.discard(k)
+        per_process[k] = stats
+        url = url or hit
+    for proc in procs:
+        proc.join()
+    return url, per_process
+
+
+async def spray(
+    prefix: str,
+    keyspace: ks.Keyspace,
+    concurrency: int,
+    processes: int = 1,
+    aimd: AIMD | None = None,
+    transport=HttpxTransport,
+    coverage: Coverage | None = None,
+) -> tuple[str | None, list[SprayStats]]:
+    """
+    One async spray, in this process or split across `processes`. With
+    `coverage` it resumes the current epoch. A secret may take several
+    hits before it rotates, so the last hit is tried again first; a new
+    epoch starts only when that candidate misses, or when the whole
+    keyspace was swept without a hit.
+    """
+
+    async def recheck(index: int) -> tuple[str | None, list[SprayStats]]:
+        candidate = keyspace.candidate(index)
+        stats = SprayStats()
+        start = time.perf_counter()
+        async with transport(prefix) as client:
+            for _ in range(MAX_ATTEMPTS):
+                stats.requests += 1
+                status = await client.status(candidate)
+                if status not in (None, 429):
+                    break
+                stats.errors += 1
+        stats.seconds = time.perf_counter() - start
+        return (prefix + candidate if status == 200 else None), [stats]
+
+    async def run():
+        if processes > 1:
+            path = coverage.path if coverage is not None else None
+            return await asyncio.get_running_loop().run_in_executor(
+                None,
+                spray_multiprocess,
+                prefix,
+                keyspace,
+                concurrency,
+                processes,
+                aimd,
+                transport,
+                path,
+            )
+        stats = SprayStats()
+        url = await spray_token(
+            prefix,
+            keyspace,
+            concurrency,
+            stats=stats,
+            aimd=aimd,
+            transport=transport,
+            coverage=coverage,
+        )
+        return url, [stats]
+
+    if coverage is None:
+        return await run()
+
+    if coverage.found >= 0:
+        url, per_process = await recheck(coverage.found)
+        if url is not None:
+            print(f"[coverage] epoch {coverage.epoch}: last hit still valid")
+            return url, per_process
+        print("[coverage] last hit missed, the secret rotated")
+        coverage.rotate()
+    elif coverage.exhausted:
+        coverage.rotate()
+    print(
+        f"[coverage] epoch {coverage.epoch}: "
+        f"{coverage.count()}/{coverage.size} candidates already tried"
+    )
+    url, per_process = await run()
+    if url is None and coverage.exhausted:
+        print("[coverage] keyspace swept without a hit, the secret rotated")
+        coverage.rotate()
+        url, per_process = await run()
+    return url, per_process
+
+
+def report(per_process: list[SprayStats]):
+    seconds = max(s.seconds for s in per_process)
+    requests = sum(s.requests for s in per_process)
+    errors = sum(s.errors for s in per_process)
+    for k, s in enumerate(per_process):
+        print(
+            f"  process {k}: {s.requests} requests | {s.errors} errors | "
+            f"{s.rate:.0f} req/s"
+        )
+        if s.timeline:
+            samples = ", ".join(
+                f"{t:.1f}s {level}@{rate:.0f}/s" for t, level, rate in s.timeline
+            )
+            print(f"    concurrency: {samples}")
+    rate = requests / seconds if seconds else 0.0
+    print(f"  total: {requests} requests | {errors} errors | {rate:.0f} req/s")
+
+
+# -----------------------
+# Benchmark
+# -----------------------
+
+PROBE_SERVERS = {
+    "flask": Path(__file__).with_name("web-server-probe.py"),
+    "async": Path(__file__).with_name("web-server-probe-async.py"),
+}
+# Two-sided 95% Student t quantiles by degrees of freedom, 1.96 past 30
+T95 = {1: 12.71, 2: 4.30, 3: 3.18, 4: 2.78, 5: 2.57, 6: 2.45, 7: 2.36, 8: 2.31}
+T95.update({9: 2.26, 10: 2.23, 15: 2.13, 20: 2.09, 30: 2.04})
+
+
+def confidence_interval(values: list[float]) -> tuple[float, float]:
+    """95% interval of the mean; tabulated t rounded down to a smaller df."""
+    mean = statistics.fmean(values)
+    n = len(values)
+    if n < 2:
+        return mean, mean
+    t = 1.96 if n > 31 else T95[max(df for df in T95 if df <= n - 1)]
+    half = t * statistics.stdev(values) / math.sqrt(n)
+    return mean - half, mean + half
+
+
+def git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=Path(__file__).parent,
+        )
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+async def bench_runs(
+    base: str,
+    keyspace: ks.Keyspace,
+    label: str,
+    concurrency: int,
+    runs: int,
+    **spray_kwargs,
+) -> list[dict]:
+    """
+    `runs` sprays against the local probe server, each after /reset plants
+    the next secret of its seeded sequence. Label "linear" runs
+    sync_validate_token instead.
+    """
+    prefix = f"{base}/probe?candidate="
+    out = []
+    for i in range(1, runs + 1):
+        httpx.post(f"{base}/reset")
+        secret = httpx.get(f"{base}/stats").json()["secret"]
+        if label == "linear":
+            per_process = [SprayStats()]
+            url = sync_validate_token(prefix, keyspace, per_process[0])
+        else:
+            url, per_process = await spray(
+                prefix, keyspace, concurrency, **spray_kwargs
+            )
+
+        seconds = max(s.seconds for s in per_process)
+        requests = sum(s.requests for s in per_process)
+        run = {
+            "label": label,
+            "concurrency": concurrency,
+            "run": i,
+            "secret": secret,
+            "found": url == prefix + secret,
+            "seconds": seconds,
+            "requests": requests,
+            "errors": sum(s.errors for s in per_process),
+            "rate": requests / seconds if seconds else 0.0,
+        }
+        out.append(run)
+        print(
+            f"[{label}] run {i}/{runs}: {seconds:.2f}s | {requests} requests | "
+            f"{run['rate']:.0f} req/s" + ("" if run["found"] else " | MISSED")
+        )
+    return out
+
+
+def summarize(label: str, concurrency: int, runs: list[dict]) -> dict:
+    """
+    Throughput in requests/s, so runs whose secret landed early or late
+    compare fairly; times are kept for reference.
+    """
+    ok = [r for r in runs if r["found"]]
+    rates = [r["rate"] for r in ok] or [float("nan")]
+    seconds = [r["seconds"] for r in ok] or [float("nan")]
+    low, high = confidence_interval(rates)
+    return {
+        "label": label,
+        "concurrency": concurrency,
+        "runs": len(runs),
+        "misses": len(runs) - len(ok),
+        "rate_mean": statistics.fmean(rates),
+        "rate_ci_low": low,
+        "rate_ci_high": high,
+        "rate_p5": percentile(rates, 5),
+        "rate_p50": percentile(rates, 50),
+        "rate_p95": percentile(rates, 95),
+        "p50_s": percentile(seconds, 50),
+        "p95_s": percentile(seconds, 95),
+    }
+
+
+def regressions(summary: list[dict], baseline: list[dict]) -> list[str]:
+    """Levels whose throughput interval lies wholly below the baseline's."""
+    previous = {(row["label"], row["concurrency"]): row for row in baseline}
+    flagged = []
+    for row in summary:
+        old = previous.get((row["label"], row["concurrency"]))
+        if old is None:
+            continue
+        if row["rate_ci_high"] < old["rate_ci_low"]:
+            flagged.append(
+                f"{row['label']}: {old['rate_mean']:.0f} → "
+                f"{row['rate_mean']:.0f} req/s"
+            )
+        if row["misses"] > old["misses"]:
+            flagged.append(
+                f"{row['label']}: misses {old['misses']} → {row['misses']}"
+            )
+    return flagged
+
+
+async def run_bench(args, keyspace: ks.Keyspace, transport, aimd: AIMD | None):
+    levels = [("linear", 1)] if args.linear else []
+    if aimd is not None:
+        levels.append(("aimd", args.concurrency))
+    else:
+        levels += [(f"async-{c}", c) for c in args.levels]
+
+    runs = []
+    server = PROBE_SERVERS[args.bench_server]
+    with local_server(server, args.bench_port, args.seed) as base:
+        for label, concurrency in levels:
+            runs += await bench_runs(
+                base,
+                keyspace,
+                label,
+                concurrency,
+                args.runs,
+                processes=args.processes,
+                aimd=aimd,
+                transport=transport,
+            )
+
+    summary = [
+        summarize(label, c, [r for r in runs if r["label"] == label])
+        for label, c in levels
+    ]
+    print("\n=== Summary (req/s) ===")
+    for row in summary:
+        print(
+            f"{row['label'] + ':':<12}mean {row['rate_mean']:.0f} "
+            f"[{row['rate_ci_low']:.0f}, {row['rate_ci_high']:.0f}] | "
+            f"p5 {row['rate_p5']:.0f} | p50 {row['rate_p50']:.0f} | "
+            f"p95 {row['rate_p95']:.0f} | misses {row['misses']}"
+        )
+
+    with open(args.json, "w") as f:
+        result = {
+            "commit": git_commit(),
+            "args": vars(args),
+            "summary": summary,
+            "runs": runs,
+        }
+        json.dump(result, f, indent=2)
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(summary[0]))
+            writer.writeheader()
+            writer.writerows(summary)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            flagged = regressions(summary, json.load(f)["summary"])
+        for line in flagged:
+            print(f"[regression] {line}")
+        if flagged:
+            sys.exit(1)
 
 
 def parse_args():
@@ -85,7 +622,7 @@ def parse_args():
     # --- Target options ---
     target_group = parser.add_argument_group("Target options")
     target_group.add_argument(
-        "--target-ip", type=str, required=True, help="Target server IP address"
+        "--target-ip", type=str, help="Target server IP address (not with --bench)"
     )
     target_group.add_argument(
         "--target-port",
@@ -97,72 +634,141 @@ def parse_args():
     parser.add_argument(
         "--concurrency", type=int, default=5, help="Number of concurrent tasks to run"
     )
-    parser.add_argument("--runs", type=int, default=10, help="Number of benchmark runs")
-
-    return parser.parse_args()
-
-
-async def main():
-    args = parse_args()
-    print(f"Target IP: {args.target_ip}")
-    print(f"Target Port: {args.target_port}")
-    print(f"Concurrency: {args.concurrency}")
-    print(f"Runs: {args.runs}")
-
-    token_list = create_list(0, 5000)
-    urls = generate_urls(args.target_ip, args.target_port, token_list)
-
-    # linear_times: list[float] = []
-    # async_times: list[float] = []
-
-    for j in range(args.concurrency, args.concurrency + 50, 5):
-        print(f"\n--- Concurrency {j} ---")
-        linear_times: list[float] = []
-        async_times: list[float] = []
-
-        time.sleep(5.0)
-
-        for i in range(1, args.runs + 1):
-            print(f"\n--- Run {i}/{args.runs} ---")
-
-            # --- Linear ---
-            start = time.perf_counter()
-            linear_result = sync_validate_token(urls)
-            end = time.perf_counter()
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="Sprayer processes, each running --concurrency tasks (default: 1)",
+    )
 
-            if linear_result is None:
-                print("[!] Linear: token not found")
-                sys.exit(1)
+    parser.add_argument(
+        "--transport",
+        choices=TRANSPORTS.keys(),
+        default="httpx",
+        help="HTTP client of the async spray (default: httpx)",
+    )
+    parser.add_argument(
+        "--pipeline",
+        type=int,
+        default=1,
+        help="Requests in flight per connection with --transport raw",
+    )
 
-            linear_time = end - start
-            linear_times.append(linear_time)
-            print(f"[+] Linear: {linear_time:.4f}s → {linear_result}")
+    parser.add_argument(
+        "--coverage",
+        default=None,
+        help="Bitmap file of tried candidates, to resume an interrupted spray",
+    )
 
-            time.sleep(5.0)
+    # --- Adaptive concurrency ---
+    aimd_group = parser.add_argument_group("Adaptive concurrency")
+    aimd_group.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Tune the worker count with AIMD from --concurrency instead of "
+        "sweeping it",
+    )
+    aimd_group.add_argument("--max-concurrency", type=int, default=AIMD.maximum)
+    aimd_group.add_argument("--aimd-step", type=int, default=AIMD.increase)
+    aimd_group.add_argument(
+        "--aimd-window",
+        type=float,
+        default=AIMD.window,
+        help="Seconds between adjustments (default: %(default)s)",
+    )
+    ks.add_arguments(parser)
+
+    # --- Benchmark ---
+    bench_group = parser.add_argument_group("Benchmark")
+    bench_group.add_argument(
+        "--bench",
+        action="store_true",
+        help="Benchmark against a local probe server instead of attacking",
+    )
+    bench_group.add_argument("--runs", type=int, default=10, help="Runs per level")
+    bench_group.add_argument(
+        "--levels",
+        type=int,
+        nargs="+",
+        default=None,
+        help="Concurrency levels (default: --concurrency up to +45 in steps of 5)",
+    )
+    bench_group.add_argument(
+        "--linear", action="store_true", help="Also time sync_validate_token"
+    )
+    bench_group.add_argument("--seed", type=int, default=0, help="Secret seed")
+    bench_group.add_argument("--bench-port", type=int, default=8100)
+    bench_group.add_argument(
+        "--bench-server",
+        choices=PROBE_SERVERS.keys(),
+        default="flask",
+        help="Probe fixture to spawn, async won't cap fast clients",
+    )
+    bench_group.add_argument("--json", default="spray-bench.json")
+    bench_group.add_argument("--csv", default=None, help="Per-level summary")
+    bench_group.add_argument(
+        "--baseline",
+        default=None,
+        help="Earlier --json output, exits 1 if any level regressed",
+    )
 
-            # --- Async ---
-            start = time.perf_counter()
-            async_result = await spray_token(urls, j)
-            end = time.perf_counter()
+    args = parser.parse_args()
+    if not args.bench and not args.target_ip:
+        parser.error("--target-ip is required unless --bench is given")
+    if args.levels is None:
+        args.levels = list(range(args.concurrency, args.concurrency + 50, 5))
+    return args
 
-            if async_result is None:
-                print("[!] Async: token not found")
-                sys.exit(1)
 
-            async_time = end - start
-            async_times.append(async_time)
-            print(f"[+] Async:  {async_time:.4f}s → {async_result}")
+async def main():
+    args = parse_args()
+    keyspace = ks.from_args(args)
+
+    transport = TRANSPORTS[args.transport]
+    if args.transport == "raw":
+        transport = functools.partial(transport, pipeline=args.pipeline)
+
+    aimd = None
+    if args.adaptive:
+        aimd = AIMD(
+            maximum=args.max_concurrency,
+            increase=args.aimd_step,
+            window=args.aimd_window,
+        )
 
-        # --- Summary ---
-        summarize("Linear", linear_times)
-        summarize("Async", async_times)
+    if args.bench:
+        await run_bench(args, keyspace, transport, aimd)
+        return
 
-        speedup = (
-            (sum(linear_times) / sum(async_times))
-            if sum(async_times) > 0
-            else float("inf")
-        )
-        print(f"\nOverall speedup: {speedup:.2f}×")
+    print(f"Target IP: {args.target_ip}")
+    print(f"Target Port: {args.target_port}")
+    print(f"Concurrency: {args.concurrency}")
+    print(f"Processes: {args.processes}")
+    print(f"Transport: {args.transport}")
+    print(f"Keyspace: {len(keyspace)} candidates")
+
+    coverage = Coverage(args.coverage, keyspace) if args.coverage else None
+    prefix = probe_prefix(args.target_ip, args.target_port)
+    start = time.perf_counter()
+    url, per_process = await spray(
+        prefix,
+        keyspace,
+        args.concurrency,
+        args.processes,
+        aimd,
+        transport,
+        coverage,
+    )
+    elapsed = time.perf_counter() - start
+    if coverage is not None:
+        coverage.close()
+
+    if url is None:
+        print(f"[!] token not found after {elapsed:.4f}s")
+        report(per_process)
+        sys.exit(1)
+    print(f"[+] {elapsed:.4f}s → {url}")
+    report(per_process)
 
 
 if __name__ == "__main__":
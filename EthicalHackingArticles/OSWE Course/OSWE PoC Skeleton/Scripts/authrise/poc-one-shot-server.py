@@ -1,39 +1,303 @@
 import argparse
+import asyncio
 import logging
+import mimetypes
+import re
 import secrets
-from http.server import BaseHTTPRequestHandler, HTTPServer
+import time
+from dataclasses import dataclass, field
+from http import HTTPStatus
 from pathlib import Path
+from typing import BinaryIO
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+INLINE_MAX = 64 * 1024  # payloads up to this size are kept in memory
+RANGE = re.compile(r"bytes=(\d*)-(\d*)$")
+BACKLOG = 4096
+HEAD_TIMEOUT = 10.0  # seconds a client gets to send its request head
+MAX_HEADERS = 100
 
-class OneShotServer(BaseHTTPRequestHandler):
-    allowed_host: str = ""
-    payload_path: Path
 
-    def do_GET(self):
-        client_ip = self.client_address[0]
+# -----------------------
+# Payload registry
+# -----------------------
+
+
+@dataclass
+class Payload:
+    path: Path
+    size: int
+    etag: str
+    content_type: str
+    data: bytes | None = None  # small payloads, read once
+    file: BinaryIO | None = None  # larger ones, sent with sendfile
+
+    def matches(self, if_none_match: str | None) -> bool:
+        tags = [tag.strip() for tag in (if_none_match or "").split(",")]
+        return "*" in tags or self.etag in tags or f"W/{self.etag}" in tags
+
+    def byte_range(self, header: str | None) -> tuple[int, int] | None:
+        """
+        (start, stop) asked for by a Range header, the whole payload when
+        there is none or it can't be honoured as a single range, None when
+        it is unsatisfiable.
+        """
+        whole = (0, self.size)
+        match = RANGE.match(header.strip()) if header else None
+        if match is None:
+            return whole
+        first, last = match.groups()
+        if not first and not last:
+            return whole
+        if not first:  # suffix: the last N bytes
+            return (max(self.size - int(last), 0), self.size) if int(last) else None
+        start = int(first)
+        stop = min(int(last) + 1, self.size) if last else self.size
+        return (start, stop) if start < stop else None
+
+    async def send(self, writer: asyncio.StreamWriter, start: int, stop: int):
+        if self.data is not None:
+            writer.write(memoryview(self.data)[start:stop])
+            await writer.drain()
+        else:
+            await writer.drain()
+            loop = asyncio.get_running_loop()
+            await loop.sendfile(writer.transport, self.file, start, stop - start)
+
+
+class PayloadRegistry:
+    """
+    Payloads by file, each read (or opened, when large) once however many
+    tokens serve it, instead of on every request.
+    """
+
+    def __init__(self):
+        self.payloads: dict[Path, Payload] = {}
+
+    def register(self, path: Path, content_type: str | None = None) -> Payload:
+        if path in self.payloads:
+            return self.payloads[path]
+        stat = path.stat()
+        if content_type is None:
+            content_type = mimetypes.guess_type(path.name)[0]
+        payload = Payload(
+            path=path,
+            size=stat.st_size,
+            etag=f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"',
+            content_type=content_type or "application/octet-stream",
+        )
+        if stat.st_size <= INLINE_MAX:
+            payload.data = path.read_bytes()
+        else:
+            payload.file = path.open("rb")
+        self.payloads[path] = payload
+        return payload
+
+    def close(self):
+        for payload in self.payloads.values():
+            if payload.file is not None:
+                payload.file.close()
+
+
+# -----------------------
+# One-shot tokens
+# -----------------------
+
+
+@dataclass
+class Token:
+    """A random route serving one payload, until it expires or runs out of hits."""
+
+    route: str
+    payload: Payload
+    expires: float  # time.monotonic() deadline
+    hits_left: int
+    served: list[tuple[int, int]] = field(default_factory=list)  # merged spans
+
+    @property
+    def spent(self) -> bool:
+        return self.hits_left <= 0 or time.monotonic() >= self.expires
+
+    def mark_served(self, start: int, stop: int) -> bool:
+        """
+        Record a span sent out. Once all of the payload has gone, in one
+        response or across ranges, that is a hit: returns True and starts
+        counting the next one.
+        """
+        spans = sorted([*self.served, (start, stop)])
+        merged = [spans[0]]
+        for lo, hi in spans[1:]:
+            if lo <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+            else:
+                merged.append((lo, hi))
+        if merged != [(0, self.payload.size)]:
+            self.served = merged
+            return False
+        self.served = []
+        self.hits_left -= 1
+        return True
+
+
+def new_token(payload: Payload, ttl: float, hits: int) -> Token:
+    route = "/" + secrets.token_urlsafe(16)
+    return Token(route, payload, time.monotonic() + ttl, hits)
+
+
+# -----------------------
+# Callback server
+# -----------------------
+
+
+def response_head(status: int, headers: dict[str, str | int], close: bool) -> bytes:
+    lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+    lines += [f"{name}: {value}" for name, value in headers.items()]
+    if close:
+        lines.append("Connection: close")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+async def read_head(reader: asyncio.StreamReader):
+    """(method, target, version, headers), None once the client has gone."""
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    method, target, version = line.decode("latin-1").split()
+    headers: dict[str, str] = {}
+    for _ in range(MAX_HEADERS):
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return method, target, version, headers
+
+
+class CallbackServer:
+    """
+    Serves one-shot tokens to `allowed_host` over asyncio, so a slow or
+    stray client (a scanner on the port) never holds up the target's
+    fetch. Stops by itself once every token is spent.
+    """
+
+    def __init__(self, allowed_host: str, tokens: list[Token]):
+        self.allowed_host = allowed_host
+        self.tokens = {token.route: token for token in tokens}
+        self.done = asyncio.Event()
+        self.clients: dict[asyncio.StreamWriter, asyncio.Task] = {}
+        self.idle: set[asyncio.StreamWriter] = set()  # waiting for a request
+
+    def check(self):
+        if all(token.spent for token in self.tokens.values()):
+            self.done.set()
+
+    async def expire(self):
+        """Wake at each token's expiry, so expired tokens count as spent."""
+        while not self.done.is_set():
+            live = [t.expires for t in self.tokens.values() if not t.spent]
+            if live:
+                await asyncio.sleep(max(min(live) - time.monotonic(), 0.0))
+            self.check()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        client_ip = writer.get_extra_info("peername")[0]
+        self.clients[writer] = asyncio.current_task()
+        try:
+            while not self.done.is_set():
+                self.idle.add(writer)
+                request = await asyncio.wait_for(read_head(reader), HEAD_TIMEOUT)
+                self.idle.discard(writer)
+                if request is None:
+                    break
+                method, target, version, headers = request
+                close = version != "HTTP/1.1" or headers.get("connection") == "close"
+                await self.respond(writer, client_ip, method, target, headers, close)
+                if close:
+                    break
+        except (ConnectionError, ValueError, asyncio.TimeoutError):
+            pass
+        finally:
+            del self.clients[writer]
+            self.idle.discard(writer)
+            writer.close()
+
+    async def respond(
+        self,
+        writer: asyncio.StreamWriter,
+        client_ip: str,
+        method: str,
+        target: str,
+        headers: dict[str, str],
+        close: bool,
+    ):
+        def send_status(status: int, extra: dict[str, str] | None = None):
+            fields = {"Content-Length": 0, **(extra or {})}
+            writer.write(response_head(status, fields, close))
 
         if client_ip != self.allowed_host:
             logging.info(f"rejecting host {client_ip}")
-            self.send_error(403)
+            send_status(403)
             return
 
-        if self.path != "/exploit":
-            logging.info(f"invalid path {self.path} from {client_ip}")
-            self.send_error(404)
+        token = self.tokens.get(target)
+        if method not in ("GET", "HEAD") or token is None or token.spent:
+            logging.info(f"invalid path {target} from {client_ip}")
+            send_status(404)
             return
+        payload = token.payload
 
-        data = self.payload_path.read_bytes()
-        self.send_response(200)
-        self.send_header("Content-Type", "text/plain")
-        self.send_header("Content-Length", str(len(data)))
-        self.end_headers()
-        self.wfile.write(data)
+        if payload.matches(headers.get("if-none-match")):
+            send_status(304, {"ETag": payload.etag})
+            token.hits_left -= 1
+            logging.info(f"{target} not modified for {client_ip}")
+            self.check()
+            return
 
-        self.server.should_stop = True
+        # A stale If-Range validator means the whole payload
+        ranged = headers.get("range")
+        if headers.get("if-range") not in (None, payload.etag):
+            ranged = None
+        span = payload.byte_range(ranged)
+        if span is None:
+            send_status(416, {"Content-Range": f"bytes */{payload.size}"})
+            return
+
+        start, stop = span
+        partial = (start, stop) != (0, payload.size)
+        fields: dict[str, str | int] = {
+            "Content-Type": payload.content_type,
+            "Content-Length": stop - start,
+            "ETag": payload.etag,
+            "Accept-Ranges": "bytes",
+        }
+        if partial:
+            fields["Content-Range"] = f"bytes {start}-{stop - 1}/{payload.size}"
+        writer.write(response_head(206 if partial else 200, fields, close))
+        if method == "HEAD":
+            return
+
+        # Counted before sending, so concurrent requests can't share a hit
+        if token.mark_served(start, stop):
+            logging.info(f"serving {target} to {client_ip}, {token.hits_left} left")
+            self.check()
+        await payload.send(writer, start, stop)
+
+    async def serve(self, host: str, port: int):
+        server = await asyncio.start_server(self.handle, host, port, backlog=BACKLOG)
+        expiry = asyncio.create_task(self.expire())
+        async with server:
+            await self.done.wait()
+            expiry.cancel()
+            # Let responses in flight finish; hang up on idle connections
+            # (scanners, say) so their handlers end instead of being cancelled
+            handlers = list(self.clients.values())
+            for writer in list(self.idle):
+                writer.close()
+            if handlers:
+                await asyncio.wait(handlers)
 
 
 def parse_args():
@@ -79,6 +343,36 @@ def parse_args():
         default=9999,
         help="Port to listen for xss or other payload (default: 9999)",
     )
+    attacker_group.add_argument(
+        "--payload",
+        type=Path,
+        action="append",
+        default=None,
+        help="File to serve, may repeat (default: a generated secret string)",
+    )
+    attacker_group.add_argument(
+        "--content-type",
+        default=None,
+        help="Content-Type of the payloads (default: guessed from their names)",
+    )
+    attacker_group.add_argument(
+        "--tokens",
+        type=int,
+        default=1,
+        help="One-shot routes per payload (default: 1)",
+    )
+    attacker_group.add_argument(
+        "--token-ttl",
+        type=float,
+        default=300.0,
+        help="Seconds before an unused token expires (default: 300)",
+    )
+    attacker_group.add_argument(
+        "--token-hits",
+        type=int,
+        default=1,
+        help="Full deliveries each token allows (default: 1)",
+    )
 
     return parser.parse_args()
 
@@ -90,23 +384,30 @@ def main():
     print(f"Listening IP: {args.listening_ip}")
     print(f"Payload Port: {args.payload_port}")
 
-    secret_string = secrets.token_urlsafe(64)
-    payload = Path("payload.txt")
-    payload.write_text(secret_string)
-
-    # start http server
-    OneShotServer.allowed_host = args.target_ip
-    OneShotServer.payload_path = payload
-
-    httpd = HTTPServer((args.listening_ip, args.payload_port), OneShotServer)
-    httpd.should_stop = False
-
-    while not httpd.should_stop:
-        httpd.handle_request()
+    paths = args.payload
+    if paths is None:
+        secret_string = secrets.token_urlsafe(64)
+        paths = [Path("payload.txt")]
+        paths[0].write_text(secret_string)
 
-    httpd.server_close()
+    registry = PayloadRegistry()
+    tokens = [
+        new_token(registry.register(path, args.content_type), args.token_ttl, hits)
+        for path in paths
+        for hits in [args.token_hits] * args.tokens
+    ]
+    base = f"http://{args.listening_ip}:{args.payload_port}"
+    for token in tokens:
+        print(f"Token: {base}{token.route} → {token.payload.path}")
 
-    Path("payload.txt").unlink()
+    # start callback server, returns once every token is spent
+    server = CallbackServer(args.target_ip, tokens)
+    try:
+        asyncio.run(server.serve(args.listening_ip, args.payload_port))
+    finally:
+        registry.close()
+        if args.payload is None:
+            paths[0].unlink()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,204 @@
+import asyncio
+from collections import deque
+from typing import Deque, List, Optional
+from urllib.parse import quote, urlsplit
+
+import httpx
+
+# Transports for spray_token in poc-brute-force-secret.py. Both take the
+# probe URL prefix (everything up to the candidate) and answer one question
+# per candidate: the response status, or None when the request failed.
+
+TIMEOUT = 2.0
+LIMITS = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+
+
+class HttpxTransport:
+    """One shared httpx.AsyncClient."""
+
+    def __init__(self, prefix: str, timeout: float = TIMEOUT):
+        self.prefix = prefix
+        self.client = httpx.AsyncClient(timeout=timeout, limits=LIMITS)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.client.aclose()
+
+    async def status(self, candidate: str) -> Optional[int]:
+        try:
+            response = await self.client.get(self.prefix + candidate)
+        except httpx.RequestError:
+            return None
+        return response.status_code
+
+
+# -----------------------
+# Raw HTTP/1.1
+# -----------------------
+
+
+class Unanswered(ConnectionResetError):
+    """The connection closed before this request's response arrived."""
+
+
+class Connection:
+    """
+    One keep-alive connection. Requests are written as they come and
+    answered in order by a reader task, so up to `pipeline` of them can be
+    outstanding at once.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.answered = 0
+        self.closed = False
+        self.task = asyncio.create_task(self.read_loop())
+
+    def send(self, request: bytes) -> asyncio.Future:
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        self.writer.write(request)
+        return waiter
+
+    async def read_loop(self):
+        try:
+            while True:
+                status, keep_alive = await read_response(self.reader)
+                if not self.waiters:
+                    break  # a response nobody asked for
+                waiter = self.waiters.popleft()
+                self.answered += 1
+                if not waiter.done():  # it may have timed out meanwhile
+                    waiter.set_result(status)
+                if not keep_alive:
+                    break
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self.close()
+
+    def close(self):
+        self.closed = True
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(Unanswered("connection closed"))
+        self.writer.close()
+
+
+async def read_response(reader: asyncio.StreamReader):
+    """(status, keep_alive) of the next response, its body read and dropped."""
+    line = await reader.readline()
+    if not line:
+        raise asyncio.IncompleteReadError(b"", None)
+    version, code, *_ = line.split(None, 2)
+    status = int(code)
+
+    length, chunked = None, False
+    keep_alive = version == b"HTTP/1.1"
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.partition(b":")
+        name = name.strip().lower()
+        if name == b"content-length":
+            length = int(value)
+        elif name == b"transfer-encoding":
+            chunked = b"chunked" in value.lower()
+        elif name == b"connection":
+            keep_alive = b"close" not in value.lower()
+
+    if chunked:
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)  # chunk and its CRLF
+            if size == 0:
+                break
+    elif length is not None:
+        await reader.readexactly(length)
+    else:
+        await reader.read()  # body runs to EOF
+        keep_alive = False
+    return status, keep_alive
+
+
+class RawTransport:
+    """
+    GET requests over plain asyncio streams. The request bytes around the
+    candidate are serialized once; only the status line and framing headers
+    of a response are parsed. Connections are reused and, with
+    `pipeline` > 1, carry that many requests in flight.
+
+    A GET the server never answered is safe to resend, so it is retried
+    once on another connection. A server that hangs up with pipelined
+    requests pending (Werkzeug does) gets one request per connection from
+    then on.
+    """
+
+    def __init__(self, prefix: str, timeout: float = TIMEOUT, pipeline: int = 1):
+        url = urlsplit(prefix)
+        self.host = url.hostname
+        self.port = url.port or 80
+        self.timeout = timeout
+        self.pipeline = pipeline
+        target = url.path + ("?" + url.query if url.query else "")
+        self.head = f"GET {target}".encode()
+        self.tail = (
+            f" HTTP/1.1\r\nHost: {url.netloc}\r\nAccept: */*\r\n\r\n".encode()
+        )
+        self.slots: Deque[Connection] = deque()  # one entry per free pipeline slot
+        self.connections: List[Connection] = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        for conn in self.connections:
+            conn.task.cancel()
+            conn.close()
+        await asyncio.gather(
+            *(conn.task for conn in self.connections), return_exceptions=True
+        )
+
+    async def acquire(self) -> Connection:
+        while self.slots:
+            conn = self.slots.popleft()
+            # Slots left over from before a fallback to pipeline 1 are dropped
+            if not conn.closed and len(conn.waiters) < self.pipeline:
+                return conn
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        conn = Connection(reader, writer)
+        self.connections = [c for c in self.connections if not c.closed]
+        self.connections.append(conn)
+        self.slots.extend([conn] * (self.pipeline - 1))
+        return conn
+
+    async def status(self, candidate: str) -> Optional[int]:
+        request = self.head + quote(candidate, safe="").encode() + self.tail
+        for _ in range(2):
+            try:
+                conn = await self.acquire()
+            except (OSError, asyncio.TimeoutError):
+                return None
+            try:
+                return await asyncio.wait_for(conn.send(request), self.timeout)
+            except Unanswered:
+                if conn.answered and self.pipeline > 1:
+                    self.pipeline = 1
+                    self.slots = deque(dict.fromkeys(self.slots))
+            except (OSError, asyncio.TimeoutError):
+                return None
+            finally:
+                if not conn.closed:
+                    self.slots.append(conn)
+        return None
+
+
+TRANSPORTS = {"httpx": HttpxTransport, "raw": RawTransport}
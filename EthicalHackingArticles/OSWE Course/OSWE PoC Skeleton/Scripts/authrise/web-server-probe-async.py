@@ -0,0 +1,300 @@
+import argparse
+import asyncio
+import json
+import mmap
+import multiprocessing
+import random
+import secrets
+import socket
+import struct
+from urllib.parse import parse_qs
+
+import netsim
+from metrics import Metrics
+
+# Load-test counterpart of web-server-probe.py: the same /probe with the
+# same rotate-after-two-hits secret, on a bare asyncio.Protocol. A probe
+# that misses reads the shared secret without any lock; only hits, which
+# may rotate it, serialize. --workers forks processes that accept on one
+# listening socket and share the secret; /metrics stays per worker.
+
+BACKLOG = 4096
+MAX_HEAD = 16 * 1024
+HIT_LIMIT = 2
+
+STATE = struct.Struct("<4sBxxxQ")  # secret, hits, epoch
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    429: "Too Many Requests",
+    431: "Request Header Fields Too Large",
+}
+
+network = None  # netsim.Network, set from the --net-* flags
+metrics = Metrics()
+
+
+class SecretState:
+    """
+    Secret, hit count and epoch in an anonymous shared mapping, created
+    before the workers fork so all of them see one secret. The secret of
+    epoch e is the (e+1)-th draw of random.Random(seed), the sequence
+    web-server-probe.py --seed produces; each process replays it locally.
+    """
+
+    def __init__(self, seed: int):
+        self.mm = mmap.mmap(-1, STATE.size)
+        self.lock = multiprocessing.Lock()
+        self.rng = random.Random(seed)
+        self.drawn = -1  # epoch of the rng's last draw in this process
+        self.write(self.secret_of(0), 0, 0)
+
+    def secret_of(self, epoch: int) -> bytes:
+        while self.drawn < epoch:
+            self.secret = str(self.rng.randint(0, 5000)).zfill(4).encode()
+            self.drawn += 1
+        return self.secret
+
+    def write(self, secret: bytes, hits: int, epoch: int):
+        STATE.pack_into(self.mm, 0, secret, hits, epoch)
+        if hits == 0:
+            print(f"[-] current_secret {secret.decode()}", flush=True)
+
+    def current(self) -> bytes:
+        """Lock-free read; a torn read during rotation only causes a miss."""
+        return self.mm[0:4]
+
+    def hit(self, candidate: bytes) -> bool:
+        with self.lock:
+            secret, hits, epoch = STATE.unpack_from(self.mm)
+            if candidate != secret:  # rotated since the lock-free check
+                return False
+            hits += 1
+            print(f"[+] candidate found {candidate.decode()} ({hits}/{HIT_LIMIT})")
+            if hits == HIT_LIMIT:
+                print("[+] hit limit reached, rotating secret")
+                self.write(self.secret_of(epoch + 1), 0, epoch + 1)
+            else:
+                self.write(secret, hits, epoch)
+            return True
+
+    def rotate(self):
+        with self.lock:
+            epoch = STATE.unpack_from(self.mm)[2] + 1
+            self.write(self.secret_of(epoch), 0, epoch)
+
+    def stats(self) -> dict:
+        secret, hits, _ = STATE.unpack_from(self.mm)
+        return {"secret": secret.decode(), "hits": hits}
+
+
+state: SecretState  # set in main(), before the workers fork
+
+
+def encode(status: int, body: bytes, content_type: str, close: bool) -> bytes:
+    head = (
+        f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        + ("Connection: close\r\n" if close else "")
+        + "\r\n"
+    )
+    return head.encode() + body
+
+
+# The two /probe answers, serialized once per keep-alive mode
+MISS = {c: encode(404, b"Parameter error", "text/plain", c) for c in (False, True)}
+FOUND = {
+    c: encode(200, b'{"message": "secret found"}', "application/json", c)
+    for c in (False, True)
+}
+
+
+def respond(method: bytes, target: bytes, close: bool) -> tuple[int, bytes]:
+    path, _, query = target.partition(b"?")
+    if path == b"/probe" and method == b"GET":
+        if query.startswith(b"candidate=") and not any(c in query for c in b"&%+"):
+            candidate = query[10:]
+        else:
+            values = parse_qs(query.decode("latin-1")).get("candidate", [""])
+            candidate = values[0].encode("latin-1")
+        if len(candidate) == 4 and candidate == state.current():
+            if state.hit(candidate):
+                return 200, FOUND[close]
+        return 404, MISS[close]
+
+    if path == b"/reset" and method == b"POST":
+        state.rotate()
+        return 200, encode(200, b'{"ok": true}', "application/json", close)
+    if path == b"/stats" and method == b"GET":
+        body = json.dumps(state.stats()).encode()
+        return 200, encode(200, body, "application/json", close)
+    if path == b"/metrics" and method == b"GET":
+        body = json.dumps(metrics.snapshot()).encode()
+        return 200, encode(200, body, "application/json", close)
+    return 404, encode(404, b"Not Found", "text/plain", close)
+
+
+class ProbeProtocol(asyncio.Protocol):
+    """
+    Parses requests straight out of the receive buffer, so pipelined
+    requests are answered in order. Request bodies are skipped; no route
+    reads one.
+    """
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.buffer = bytearray()
+        self.skip = 0  # body bytes of the last request still to discard
+        self.ready_at = 0.0  # netsim: when the previous response goes out
+        self.peer = (transport.get_extra_info("peername") or ("?",))[0]
+
+    def data_received(self, data: bytes):
+        self.buffer += data
+        while True:
+            if self.skip:
+                dropped = min(self.skip, len(self.buffer))
+                del self.buffer[:dropped]
+                self.skip -= dropped
+                if self.skip:
+                    return
+
+            end = self.buffer.find(b"\r\n\r\n")
+            if end < 0:
+                if len(self.buffer) > MAX_HEAD:
+                    self.transport.write(encode(431, b"", "text/plain", True))
+                    self.transport.close()
+                return
+            head = bytes(self.buffer[:end])
+            del self.buffer[: end + 4]
+            if not self.handle(head):
+                self.close()
+                return
+
+    def handle(self, head: bytes) -> bool:
+        """Answer one request; False once the connection should close."""
+        started = metrics.begin()
+        line, _, headers = head.partition(b"\r\n")
+        connection = b""
+        try:
+            method, target, version = line.split(b" ")
+            for field in headers.split(b"\r\n"):
+                name, _, value = field.partition(b":")
+                name = name.strip().lower()
+                if name == b"content-length":
+                    length = int(value)
+                    if length < 0:
+                        raise ValueError(f"negative Content-Length {length}")
+                    self.skip = length
+                elif name == b"connection":
+                    connection = value.strip().lower()
+        except ValueError:
+            metrics.end("?", started, 400)
+            self.transport.write(encode(400, b"", "text/plain", True))
+            return False
+
+        if version == b"HTTP/1.1":
+            close = b"close" in connection
+        else:
+            close = b"keep-alive" not in connection
+
+        path = target.partition(b"?")[0].decode("latin-1")
+        delay = 0.0
+        if network is not None and path not in netsim.CONTROL_PATHS:
+            if network.drop():
+                metrics.end(path, started, 0)  # 0: dropped, no status sent
+                self.transport.abort()
+                return False
+            if not network.admit(self.peer):
+                metrics.end(path, started, 429)
+                body = b'{"ok": false, "error": "rate limited"}'
+                self.send(encode(429, body, "application/json", close), 0.0)
+                return not close
+            delay = network.delay()
+
+        status, response = respond(method, target, close)
+        metrics.end(path, started, status)
+        self.send(response, delay)
+        return not close
+
+    def close(self):
+        if self.ready_at:  # after the delayed responses still due
+            asyncio.get_running_loop().call_at(self.ready_at, self.transport.close)
+        else:
+            self.transport.close()
+
+    def send(self, response: bytes, delay: float):
+        if not delay and not self.ready_at:
+            self.transport.write(response)
+            return
+        # Delayed responses still leave in request order
+        loop = asyncio.get_running_loop()
+        self.ready_at = max(loop.time() + delay, self.ready_at)
+        loop.call_at(self.ready_at, self.transport.write, response)
+
+
+async def serve(sock: socket.socket):
+    loop = asyncio.get_running_loop()
+    server = await loop.create_server(ProbeProtocol, sock=sock, backlog=BACKLOG)
+    async with server:
+        await server.serve_forever()
+
+
+def run_worker(sock: socket.socket):
+    try:
+        asyncio.run(serve(sock))
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    global network, state
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--seed", type=int, default=None, help="Seed the secret sequence"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes accepting on the port, sharing one secret. /metrics "
+        "only counts the worker that answers it (default: 1)",
+    )
+    netsim.add_arguments(parser)
+    args = parser.parse_args()
+
+    network = netsim.from_args(args)
+    seed = args.seed if args.seed is not None else secrets.randbits(64)
+    state = SecretState(seed)
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(BACKLOG)
+    sock.setblocking(False)
+
+    if args.workers == 1:
+        run_worker(sock)
+        return
+
+    ctx = multiprocessing.get_context("fork")
+    workers = [
+        ctx.Process(target=run_worker, args=(sock,)) for _ in range(args.workers)
+    ]
+    for worker in workers:
+        worker.start()
+    print(f"[server] {args.workers} workers on {args.host}:{args.port}")
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
+
+
+if __name__ == "__main__":
+    main()
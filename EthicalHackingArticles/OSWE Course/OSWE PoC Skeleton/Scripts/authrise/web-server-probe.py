@@ -1,11 +1,16 @@
+import argparse
 import random
 import threading
 
 from flask import Flask, jsonify, request
 
+import netsim
+from metrics import Metrics, install
+
 app = Flask(__name__)
 
 state_lock = threading.Lock()
+metrics = Metrics()
 
 
 def generate_secret():
@@ -19,6 +24,26 @@ current_secret = generate_secret()
 hit_count = 0
 
 
+@app.route("/metrics", methods=["GET"])
+def metrics_view():
+    return jsonify(metrics.snapshot())
+
+
+@app.route("/reset", methods=["POST"])
+def reset():
+    """Plant the next secret of the (seeded) sequence, for benchmark runs."""
+    global current_secret, hit_count
+    with state_lock:
+        current_secret = generate_secret()
+        hit_count = 0
+    return jsonify(ok=True)
+
+
+@app.route("/stats", methods=["GET"])
+def stats():
+    return jsonify(secret=current_secret, hits=hit_count)
+
+
 @app.route("/probe", methods=["GET"])
 def probe():
     candidate = request.args.get("candidate")
@@ -46,4 +71,16 @@ def probe():
 
 
 if __name__ == "__main__":
-    app.run(port=8000)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--seed", type=int, default=None, help="Seed the secret sequence"
+    )
+    netsim.add_arguments(parser)
+    args = parser.parse_args()
+
+    install(app, metrics, netsim.from_args(args))
+    if args.seed is not None:
+        random.seed(args.seed)
+        current_secret = generate_secret()
+    app.run(port=args.port)